@@ -0,0 +1,56 @@
+import asyncio
+import contextlib
+
+from fastapi import HTTPException
+
+from config import settings
+
+
+class AdmissionControl:
+    """
+    Caps how many heavy card loads run at once on this instance. A load
+    takes one of max_active slots; up to max_waiting more queue for one,
+    and past that requests are shed straight away with 503 and Retry-After
+    rather than piling up behind work that would outlast their timeouts.
+    Cheap endpoints (merge, close, health) never go through here.
+    """
+
+    def __init__(
+        self,
+        max_active: int = settings.CARD_LOAD_CONCURRENCY,
+        max_waiting: int = settings.CARD_LOAD_QUEUE,
+        retry_after: int = settings.CARD_LOAD_RETRY_AFTER,
+    ):
+        self.max_waiting = max_waiting
+        self.retry_after = retry_after
+        self._slots = asyncio.Semaphore(max_active)
+        self.active = 0
+        self.waiting = 0
+        self.shed = 0
+
+    @contextlib.asynccontextmanager
+    async def admit(self):
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.shed += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many PR queues are loading right now; try again shortly",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def snapshot(self) -> dict:
+        return {"active": self.active, "waiting": self.waiting, "shed": self.shed}
+
+
+admission = AdmissionControl()
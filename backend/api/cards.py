@@ -0,0 +1,401 @@
+import asyncio
+import itertools
+import random
+from typing import Callable, Optional
+
+from api.fields import FULL, FieldSet
+from api.pipeline import Stage
+from api.repo_cache import repo_cache
+from auth.permissions import (
+    check_push_access,
+    forget_permission_on_denial,
+    has_push_access,
+    permission_cache,
+)
+from config import settings
+from github.client import GitHubAPIError, GitHubClient
+from github.discovery import discover_repos_with_open_prs, repo_queries
+from github.records import PullRequestCounts, PullRequestRecord
+from github.refresh import RefreshEngine, repo_fingerprint
+from models.schemas import PRAuthor, PRResponse, PRStats
+from models.scoring import (
+    ScoreColumns,
+    compatibility_scores,
+    generate_bios,
+    parse_timestamp,
+    top_k_first,
+)
+
+QUEUE_ORDERS = ("score", "age", "random")
+
+
+def summarize_pull_request(repo: str, pr: PullRequestRecord) -> PRResponse:
+    # Everything here comes straight from the pulls listing, so summary cards
+    # cost no per-PR GitHub calls
+    return PRResponse(
+        number=pr.number,
+        title=pr.title,
+        html_url=pr.html_url,
+        head_branch=pr.head_ref,
+        head_sha=pr.head_sha,
+        base_branch=pr.base_ref,
+        repo=repo,
+        author_login=pr.author_login,
+        draft=pr.draft,
+    )
+
+
+async def fetch_author(client: GitHubClient, login: str) -> dict:
+    try:
+        return await client.get_user(login)
+    except Exception as e:
+        print(f"[DEBUG] Error fetching user {login}: {e}")
+        return {
+            "login": login,
+            "avatar_url": "",
+            "html_url": "",
+            "name": None,
+            "bio": None,
+            "public_repos": 0,
+            "followers": 0,
+        }
+
+
+def pull_request_stats(
+    pr: PullRequestRecord, counts: PullRequestCounts, age_days: int
+) -> PRStats:
+    return PRStats(
+        additions=counts.additions,
+        deletions=counts.deletions,
+        changed_files=counts.changed_files,
+        commits=counts.commits,
+        comments=counts.comments,
+        review_comments=counts.reviews,
+        requested_reviewers=list(pr.requested_reviewers),
+        labels=[label.lower() for label in pr.labels],
+        mergeable=pr.mergeable,
+        draft=pr.draft,
+        created_at=parse_timestamp(pr.created_at),
+        updated_at=parse_timestamp(pr.updated_at),
+        age_days=age_days,
+    )
+
+
+class CardJob:
+    """
+    One PR card on its way through the pipeline. A job that fails (or is
+    served from the cache) skips the remaining stages.
+    """
+
+    __slots__ = (
+        "repo",
+        "number",
+        "order",
+        "pr",
+        "card",
+        "author",
+        "counts",
+        "status",
+        "error",
+    )
+
+    def __init__(
+        self,
+        repo: str,
+        number: int,
+        order: int,
+        pr: Optional[PullRequestRecord] = None,
+    ):
+        self.repo = repo
+        self.number = number
+        self.order = order
+        self.pr = pr
+        self.card: Optional[PRResponse] = None
+        self.author: Optional[dict] = None
+        self.counts: Optional[PullRequestCounts] = None
+        self.status = 200
+        self.error: Optional[str] = None
+
+    @property
+    def pending(self) -> bool:
+        return self.card is None and self.error is None
+
+
+class CardBuilder:
+    """
+    The stages PR cards are built in, from discovering the user's repos to
+    the finished PRResponse. Only the GitHub calls the field set needs are
+    made. A strict builder raises the first error; otherwise a failed card
+    keeps its status and error and the rest of the batch carries on.
+    """
+
+    def __init__(
+        self,
+        client: GitHubClient,
+        engine: RefreshEngine,
+        fields: FieldSet = FULL,
+        strict: bool = True,
+        wait_for_mergeable: bool = True,
+    ):
+        self.client = client
+        self.engine = engine
+        self.fields = fields
+        self.strict = strict
+        self.wait_for_mergeable = wait_for_mergeable
+        self.errors: dict[str, Exception] = {}
+        self.seen_repos: set[str] = set()
+        self._access: dict[str, asyncio.Task] = {}
+        self._order = itertools.count()
+
+    def job(self, repo: str, number: int) -> CardJob:
+        return CardJob(repo, number, next(self._order))
+
+    def discover_stage(self) -> Stage:
+        return Stage("discover", self.discover, fan_out=True)
+
+    def list_stage(self) -> Stage:
+        return Stage("list", self.list_prs, settings.PIPELINE_CONCURRENCY, fan_out=True)
+
+    def access_stage(self) -> Stage:
+        return self._stage("access", self.check_access)
+
+    def card_stages(self) -> list[Stage]:
+        return [
+            self._stage(
+                "cache",
+                self.lookup,
+                lambda job: job.pr is not None and bool(self.fields.parts),
+            ),
+            self._stage("details", self.fetch_details, self._needs_details),
+            self._stage(
+                "authors", self.fetch_author, lambda job: self.fields.needs_author
+            ),
+            self._stage(
+                "stats", self.fetch_counts, lambda job: self.fields.needs_stats
+            ),
+            self._stage(
+                "score", self.build, concurrency=1, batch_size=settings.SCORE_BATCH_SIZE
+            ),
+        ]
+
+    def _stage(
+        self,
+        name: str,
+        fn: Callable,
+        when: Optional[Callable[[CardJob], bool]] = None,
+        concurrency: int = settings.PIPELINE_CONCURRENCY,
+        batch_size: int = 1,
+    ) -> Stage:
+        async def guarded(item):
+            jobs = item if batch_size > 1 else [item]
+            try:
+                return await fn(item)
+            except Exception as e:
+                for repo in {job.repo for job in jobs}:
+                    await forget_permission_on_denial(self.client, repo, e)
+                if self.strict:
+                    raise
+                for job in jobs:
+                    print(f"[DEBUG] Error loading {job.repo}#{job.number}: {e}")
+                    job.status = e.status_code if isinstance(e, GitHubAPIError) else 502
+                    job.error = str(e)
+                return item
+
+        return Stage(
+            name,
+            guarded,
+            concurrency,
+            when=lambda job: job.pending and (when is None or when(job)),
+            batch_size=batch_size,
+        )
+
+    async def discover(self, _) -> list[tuple[str, tuple]]:
+        repos_data = await self.client.list_repos(per_page=100)
+        await permission_cache.seed(self.client.identity, repos_data)
+
+        push_repos_data = [repo for repo in repos_data if has_push_access(repo)]
+        self.engine.count_queries = repo_queries(push_repos_data)
+
+        pr_repos_data = await discover_repos_with_open_prs(self.client, push_repos_data)
+        if pr_repos_data is None:
+            pr_repos_data = push_repos_data
+
+        items = [(repo["full_name"], repo_fingerprint(repo)) for repo in pr_repos_data]
+        # Repos that changed since the last refresh go first: they are the
+        # ones with new cards or details to fetch
+        items.sort(key=lambda item: not self.engine.has_changed(*item))
+        return items
+
+    async def list_prs(self, item: tuple[str, Optional[tuple]]) -> list[CardJob]:
+        full_name, fingerprint = item
+        self.seen_repos.add(full_name)
+        owner, repo_name = full_name.split("/", 1)
+        try:
+            # Details are fetched per card further down, and only for cards
+            # the cache can't serve
+            prs = await self.engine.refresh_repo(
+                owner, repo_name, fingerprint, with_details=False
+            )
+        except Exception as e:
+            self.engine.forget(full_name)
+            await forget_permission_on_denial(self.client, full_name, e)
+            if self.strict:
+                raise
+            print(f"[DEBUG] Error fetching PRs from {full_name}: {e}")
+            self.errors[full_name] = e
+            return []
+
+        jobs = []
+        for pr in prs:
+            job = self.job(full_name, pr.number)
+            job.pr = pr
+            jobs.append(job)
+        return jobs
+
+    async def check_access(self, job: CardJob) -> CardJob:
+        # One check per repo, shared by every card of the batch
+        check = self._access.get(job.repo)
+        if check is None:
+            check = self._access[job.repo] = asyncio.ensure_future(
+                check_push_access(self.client, job.repo)
+            )
+        denial = await check
+        if denial is not None:
+            job.status = denial.status_code
+            job.error = denial.detail
+            return job
+        job.pr = self.engine.pull_request(job.repo, job.number, detailed=False)
+        return job
+
+    async def lookup(self, job: CardJob) -> CardJob:
+        job.card = await repo_cache.get(
+            self.client, job.repo, job.pr, self.fields.parts
+        )
+        return job
+
+    def _needs_details(self, job: CardJob) -> bool:
+        # Listing items lack mergeability, which only stats cards use
+        return job.pr is None or (self.fields.needs_details and not job.pr.detailed)
+
+    async def fetch_details(self, job: CardJob) -> CardJob:
+        known = job.pr
+        owner, repo_name = job.repo.split("/", 1)
+        pr = await repo_cache.fetch(
+            self.client,
+            job.repo,
+            f"details:{job.repo.lower()}#{job.number}:{self.wait_for_mergeable}",
+            lambda: self.client.get_pull_request_record(
+                owner, repo_name, job.number, wait_for_mergeable=self.wait_for_mergeable
+            ),
+        )
+        self.engine.remember(job.repo, pr)
+        if pr.state != "open":
+            job.status = 410
+            job.error = "This PR is no longer open."
+            return job
+        job.pr = pr
+        # Only look the card up again if the cache stage didn't already, or
+        # the PR moved on since it was listed
+        if self.fields.parts and (known is None or known.updated_at != pr.updated_at):
+            job.card = await repo_cache.get(
+                self.client, job.repo, pr, self.fields.parts
+            )
+        return job
+
+    async def fetch_author(self, job: CardJob) -> CardJob:
+        job.author = await fetch_author(self.client, job.pr.author_login)
+        return job
+
+    async def fetch_counts(self, job: CardJob) -> CardJob:
+        owner, repo_name = job.repo.split("/", 1)
+        pr = job.pr
+        job.counts = await repo_cache.fetch(
+            self.client,
+            job.repo,
+            f"counts:{job.repo.lower()}#{pr.number}:{pr.updated_at}:{pr.head_sha}",
+            lambda: self.client.count_pull_request_activity(
+                owner, repo_name, job.number
+            ),
+        )
+        return job
+
+    async def build(self, jobs: list[CardJob]) -> list[CardJob]:
+        updates = {}
+        for job in jobs:
+            card = summarize_pull_request(job.repo, job.pr)
+            if not self.fields.parts:
+                # Nothing fetched for this card; the body comes from the
+                # listing like the rest, but is only kept when asked for
+                if "body" in self.fields.fields:
+                    card = card.model_copy(update={"body": job.pr.body})
+                job.card = card
+                continue
+            update = {"body": job.pr.body}
+            if job.author is not None:
+                update["author"] = PRAuthor(
+                    login=card.author_login,
+                    avatar_url=job.author.get("avatar_url", ""),
+                    html_url=job.author.get("html_url", ""),
+                    name=job.author.get("name"),
+                    bio=job.author.get("bio"),
+                    public_repos=job.author.get("public_repos", 0),
+                    followers=job.author.get("followers", 0),
+                )
+            updates[job.order] = (job, card, update)
+
+        # Scores and bios are computed for the whole batch at once
+        scored = [job for job in jobs if job.counts is not None]
+        if scored:
+            columns = ScoreColumns.from_records(
+                [job.pr for job in scored], [job.counts for job in scored]
+            )
+            bios = generate_bios(columns)
+            scores = compatibility_scores(columns)
+            for i, job in enumerate(scored):
+                updates[job.order][2].update(
+                    stats=pull_request_stats(job.pr, job.counts, columns.age_days[i]),
+                    generated_bio=bios[i],
+                    compatibility_score=scores[i],
+                )
+
+        for job, card, update in updates.values():
+            job.card = card.model_copy(update=update)
+        await asyncio.gather(
+            *[
+                repo_cache.store(job.repo, job.pr, self.fields.parts, job.card)
+                for job, _, _ in updates.values()
+            ]
+        )
+        return jobs
+
+
+def rank_cards(jobs: list[CardJob], order: str = "random") -> list[PRResponse]:
+    # Shuffled first so ties, and the backlog behind the ranked first page,
+    # stay in random order
+    random.shuffle(jobs)
+    if order == "score":
+        # Cards built without stats are ranked on what the listing tells us:
+        # age and draft state, with mergeability and activity unknown
+        unscored = [job for job in jobs if job.card.compatibility_score is None]
+        columns = ScoreColumns.from_records(
+            [job.pr for job in unscored], [None] * len(unscored)
+        )
+        estimates = dict(
+            zip((job.order for job in unscored), compatibility_scores(columns))
+        )
+        jobs = top_k_first(
+            jobs,
+            key=lambda job: (
+                job.card.compatibility_score
+                if job.card.compatibility_score is not None
+                else estimates[job.order]
+            ),
+            k=settings.RANKED_PAGE_SIZE,
+        )
+    elif order == "age":
+        jobs = top_k_first(
+            jobs,
+            key=lambda job: -parse_timestamp(job.pr.created_at).timestamp(),
+            k=settings.RANKED_PAGE_SIZE,
+        )
+    return [job.card for job in jobs]
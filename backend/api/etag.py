@@ -0,0 +1,72 @@
+import hashlib
+import time
+from typing import Optional
+
+from fastapi import Request, Response
+
+from auth.session import UserSession
+from config import settings
+
+# Per-session rendered responses kept for RESPONSE_MAX_AGE seconds
+MAX_CACHED_RESPONSES = 32
+
+
+def compute_etag(body: bytes) -> str:
+    return f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(
+    request: Request, body: bytes, etag: str, headers: Optional[dict] = None
+) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", **(headers or {})}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+class CachedResponse:
+    __slots__ = ("body", "etag", "created_at")
+
+    def __init__(self, body: bytes):
+        self.body = body
+        self.etag = compute_etag(body)
+        self.created_at = time.monotonic()
+
+
+def _cache_key(request: Request) -> str:
+    return f"{request.url.path}?{request.url.query}"
+
+
+def cached_response(session: UserSession, request: Request) -> Optional[Response]:
+    """
+    Replays a response rendered for this session within the last
+    RESPONSE_MAX_AGE seconds, answering 304 if the client already has it.
+    """
+    responses = session.state.get("responses", {})
+    cached = responses.get(_cache_key(request))
+    if cached is None:
+        return None
+    if time.monotonic() - cached.created_at > settings.RESPONSE_MAX_AGE:
+        del responses[_cache_key(request)]
+        return None
+    return etag_response(request, cached.body, cached.etag)
+
+
+def store_response(session: UserSession, request: Request, body: bytes) -> Response:
+    responses = session.state.setdefault("responses", {})
+    cached = responses[_cache_key(request)] = CachedResponse(body)
+    while len(responses) > MAX_CACHED_RESPONSES:
+        del responses[next(iter(responses))]
+    return etag_response(request, body, cached.etag)
+
+
+def forget_responses(session: UserSession) -> None:
+    session.state.pop("responses", None)
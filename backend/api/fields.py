@@ -0,0 +1,100 @@
+from typing import Optional
+
+from fastapi import HTTPException, Query
+
+from models.schemas import PRResponse
+
+PR_FIELDS = frozenset(PRResponse.model_fields)
+
+# Cards are keyed by (repo, number), so those two are always returned
+KEY_FIELDS = frozenset({"repo", "number"})
+
+# Everything the pulls listing alone can provide
+SUMMARY_FIELDS = frozenset(
+    {
+        "number",
+        "title",
+        "html_url",
+        "head_branch",
+        "head_sha",
+        "base_branch",
+        "repo",
+        "author_login",
+        "draft",
+    }
+)
+
+# Fields computed from the files/commits/reviews/comments endpoints (and the
+# PR's mergeability, which only the detail endpoint reports)
+STATS_FIELDS = frozenset({"stats", "generated_bio", "compatibility_score"})
+
+
+class FieldSet:
+    """
+    The PRResponse fields a request asked for. Decides both which GitHub
+    calls are made while building cards and what is serialized.
+    """
+
+    __slots__ = ("fields",)
+
+    def __init__(self, fields: frozenset[str]):
+        self.fields = fields | KEY_FIELDS
+
+    @property
+    def key(self) -> str:
+        return ",".join(sorted(self.fields))
+
+    @property
+    def is_full(self) -> bool:
+        return self.fields == PR_FIELDS
+
+    @property
+    def needs_author(self) -> bool:
+        return "author" in self.fields
+
+    @property
+    def needs_stats(self) -> bool:
+        return not self.fields.isdisjoint(STATS_FIELDS)
+
+    @property
+    def needs_details(self) -> bool:
+        return self.needs_stats
+
+    @property
+    def parts(self) -> str:
+        # Which enrichment a cached card carries; used in its cache key
+        return "+".join(
+            part
+            for part, needed in (
+                ("author", self.needs_author),
+                ("stats", self.needs_stats),
+            )
+            if needed
+        )
+
+    @property
+    def include(self) -> Optional[dict]:
+        # pydantic include spec for a list of cards; None serializes everything
+        return None if self.is_full else {"__all__": set(self.fields)}
+
+
+FULL = FieldSet(PR_FIELDS)
+SUMMARY = FieldSet(SUMMARY_FIELDS)
+
+
+def get_field_set(
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = Query(
+        None,
+        description="Comma-separated PRResponse fields; overrides view",
+    ),
+) -> FieldSet:
+    if fields is None:
+        return FULL if view == "full" else SUMMARY
+    requested = frozenset(name.strip() for name in fields.split(",") if name.strip())
+    unknown = requested - PR_FIELDS
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return FieldSet(requested)
@@ -0,0 +1,216 @@
+import asyncio
+import contextlib
+import time
+from typing import Any, Awaitable, Callable, Iterable, Optional
+
+from fastapi import Request
+
+from config import settings
+
+# How often a running pipeline checks whether its client went away
+DISCONNECT_POLL_INTERVAL = 0.5
+
+_DONE = object()
+
+
+class ClientDisconnected(Exception):
+    pass
+
+
+class PipelineMetrics:
+    """
+    Process-wide stage timings, summed over every run of each kind of
+    pipeline (repo listing, full queue, details), served by /metrics.
+    """
+
+    def __init__(self):
+        self.runs: dict[str, int] = {}
+        self.stages: dict[str, dict[str, dict]] = {}
+
+    def record(self, kind: str, pipeline: "Pipeline") -> None:
+        self.runs[kind] = self.runs.get(kind, 0) + 1
+        stages = self.stages.setdefault(kind, {})
+        for name, timing in pipeline.timings().items():
+            total = stages.setdefault(name, {"items": 0, "seconds": 0.0})
+            total["items"] += timing["items"]
+            total["seconds"] += timing["seconds"]
+
+    def snapshot(self) -> dict:
+        return {
+            kind: {
+                "runs": runs,
+                "stages": {
+                    name: {
+                        "items": total["items"],
+                        "seconds": round(total["seconds"], 3),
+                    }
+                    for name, total in self.stages[kind].items()
+                },
+            }
+            for kind, runs in self.runs.items()
+        }
+
+
+pipeline_metrics = PipelineMetrics()
+
+
+async def wait_unless_disconnected(task: asyncio.Future, request: Optional[Request]):
+    # Waits for task, raising ClientDisconnected if the client goes away
+    # first; the task itself is left for the caller to cancel or not
+    if request is None:
+        return await asyncio.shield(task)
+    while True:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_INTERVAL)
+        if done:
+            return task.result()
+        if await request.is_disconnected():
+            raise ClientDisconnected()
+
+
+class Stage:
+    """
+    One step of a pipeline. fn takes an item and returns the item to pass
+    on, None to drop it or, for fan_out stages, an iterable of items. With
+    batch_size > 1, fn instead takes a list of whatever items are already
+    queued (up to batch_size) and returns the list to pass on. Items that
+    don't match `when` skip the stage untouched.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable[[Any], Awaitable[Any]],
+        concurrency: int = 1,
+        fan_out: bool = False,
+        when: Optional[Callable[[Any], bool]] = None,
+        batch_size: int = 1,
+    ):
+        self.name = name
+        self.fn = fn
+        self.concurrency = concurrency
+        self.fan_out = fan_out
+        self.when = when
+        self.batch_size = batch_size
+        self.items = 0
+        self.seconds = 0.0
+
+    async def process(self, items: list) -> list:
+        todo, passed = [], []
+        for item in items:
+            (todo if self.when is None or self.when(item) else passed).append(item)
+        if not todo:
+            return passed
+        start = time.perf_counter()
+        try:
+            if self.batch_size > 1:
+                return passed + list(await self.fn(todo))
+            result = await self.fn(todo[0])
+        finally:
+            self.items += len(todo)
+            self.seconds += time.perf_counter() - start
+        if self.fan_out:
+            return passed + list(result)
+        return passed if result is None else passed + [result]
+
+
+class Pipeline:
+    """
+    Runs items through stages connected by bounded queues, each stage with
+    its own number of workers, so slow stages apply backpressure instead of
+    buffering everything. An exception in any stage (or the client
+    disconnecting) cancels the whole run.
+    """
+
+    def __init__(
+        self, stages: list[Stage], queue_size: int = settings.PIPELINE_QUEUE_SIZE
+    ):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.steps: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def timed(self, name: str):
+        # For work done on the collected results, e.g. serializing them
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = time.perf_counter() - start
+
+    def timings(self) -> dict[str, dict]:
+        # Busy time summed over a stage's workers, so it can exceed wall time
+        timings = {
+            stage.name: {"items": stage.items, "seconds": round(stage.seconds, 3)}
+            for stage in self.stages
+        }
+        for name, seconds in self.steps.items():
+            timings[name] = {"items": 1, "seconds": round(seconds, 3)}
+        return timings
+
+    async def run(
+        self,
+        items: Iterable,
+        request: Optional[Request] = None,
+        results: Optional[list] = None,
+    ) -> list:
+        # Finished items are appended to results as they come out, so a
+        # caller holding the list can read them before the run ends
+        work = asyncio.create_task(self._run(items, [] if results is None else results))
+        try:
+            return await wait_unless_disconnected(work, request)
+        finally:
+            if not work.done():
+                work.cancel()
+                await asyncio.gather(work, return_exceptions=True)
+
+    async def _run(self, items: Iterable, results: list) -> list:
+        queues = [asyncio.Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+
+        async def feed():
+            for item in items:
+                await queues[0].put(item)
+            await queues[0].put(_DONE)
+
+        async def worker(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+            while True:
+                # Batches never wait to fill up; they take what is queued
+                batch = [await inbox.get()]
+                while len(batch) < stage.batch_size and not inbox.empty():
+                    batch.append(inbox.get_nowait())
+                done = any(item is _DONE for item in batch)
+                if done:
+                    batch = [item for item in batch if item is not _DONE]
+                if batch:
+                    for out in await stage.process(batch):
+                        await outbox.put(out)
+                if done:
+                    # Leave the marker for this stage's other workers
+                    await inbox.put(_DONE)
+                    return
+
+        async def run_stage(i: int, stage: Stage):
+            async with asyncio.TaskGroup() as group:
+                for _ in range(stage.concurrency):
+                    group.create_task(worker(stage, queues[i], queues[i + 1]))
+            await queues[i + 1].put(_DONE)
+
+        async def collect():
+            while (item := await queues[-1].get()) is not _DONE:
+                results.append(item)
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                group.create_task(feed())
+                for i, stage in enumerate(self.stages):
+                    group.create_task(run_stage(i, stage))
+                group.create_task(collect())
+        except BaseExceptionGroup as group_error:
+            # Surface the stage's own exception rather than the group
+            raise _first_error(group_error) from None
+        return results
+
+
+def _first_error(error: BaseException) -> BaseException:
+    while isinstance(error, BaseExceptionGroup):
+        error = error.exceptions[0]
+    return error
@@ -1,49 +1,286 @@
-import random
-from typing import List
-from datetime import datetime, timezone
-
-from fastapi import APIRouter, HTTPException, Query, Request, Depends
-
-from auth.session import require_auth
-from github.client import GitHubClient
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, List, Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, Depends
+
+from api.cards import QUEUE_ORDERS, CardBuilder, CardJob, rank_cards
+from api.etag import (
+    cached_response,
+    compute_etag,
+    etag_response,
+    forget_responses,
+    store_response,
+)
+from api.fields import FULL, FieldSet, get_field_set
+from api.admission import admission
+from api.pipeline import Pipeline, pipeline_metrics, wait_unless_disconnected
+from auth.permissions import (
+    forget_permission_on_denial,
+    require_push_access,
+)
+from auth.session import UserSession, get_github_client, get_user_session
+from github.client import GitHubClient, GitHubAPIError
+from github.discovery import BASE_QUERY
+from github.refresh import RefreshEngine
 from models.schemas import (
     PRResponse,
-    PRAuthor,
-    PRStats,
     MergeRequest,
     CloseRequest,
     MergeResponse,
     CloseResponse,
+    PRChangesResponse,
+    PRCountResponse,
+    PRDetailsRequest,
+    PRDetailsResponse,
+    PRDetailsResult,
+    PRKey,
 )
-from models.bio import generate_pr_bio, compute_compatibility_score
+from models.snapshot import PR_LIST, PRSnapshot
 from config import settings
 
 router = APIRouter(prefix="/api/prs", tags=["prs"])
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION_HEADER = "X-Snapshot-Version"
+# Set on deadline-bounded loads that ran out of time; the token is the
+# snapshot version to pass as `since` to /all/changes for the rest
+QUEUE_COMPLETE_HEADER = "X-Queue-Complete"
+CONTINUATION_HEADER = "X-Continuation-Token"
+
+# Strong references, so background loads aren't garbage collected
+_background: set[asyncio.Task] = set()
+
+
+def get_queue_order(
+    order: str = Query("random", pattern=f"^({'|'.join(QUEUE_ORDERS)})$"),
+) -> str:
+    return order
+
+
+def get_deadline(
+    deadline_ms: Optional[int] = Query(
+        None, ge=1, description="Latency budget; returns partial results past it"
+    ),
+) -> Optional[float]:
+    if deadline_ms is None:
+        return None
+    return time.monotonic() + deadline_ms / 1000
+
+
+def queue_key(fields: FieldSet, order: str) -> str:
+    return f"{fields.key}:{order}"
+
+
+def session_snapshot(
+    session: UserSession, fields: FieldSet, order: str, used: bool = True
+) -> Optional[PRSnapshot]:
+    # Each field set (and ordering) gets its own versioned queue so a client
+    # never gets summary cards diffed against full ones. Queues are
+    # remembered, most recently used last, so the background scheduler can
+    # rebuild them; only the last few are kept. Background work passes
+    # used=False: it neither counts as use nor brings back a queue dropped
+    # in the meantime, and gets None for one.
+    snapshots = session.state.setdefault("snapshots", {})
+    queues = session.state.setdefault("queues", OrderedDict())
+    key = queue_key(fields, order)
+    if not used:
+        return snapshots.get(key) if key in queues else None
+    queues[key] = (fields, order)
+    queues.move_to_end(key)
+    while len(queues) > settings.SESSION_MAX_QUEUES:
+        dropped, _ = queues.popitem(last=False)
+        snapshots.pop(dropped, None)
+    snapshot = snapshots.get(key)
+    if snapshot is None:
+        snapshot = snapshots[key] = PRSnapshot(fields.include)
+    return snapshot
+
+
+async def get_snapshot(
+    fields: FieldSet = Depends(get_field_set),
+    order: str = Depends(get_queue_order),
+    session: UserSession = Depends(get_user_session),
+) -> PRSnapshot:
+    return session_snapshot(session, fields, order)
+
+
+def start_background_refresh(
+    session: UserSession, work: Callable[[], Awaitable]
+) -> asyncio.Task:
+    # One background refresh per session at a time. Requests don't wait on
+    # it as a whole, only on the queue load it is running (see
+    # start_queue_load)
+    task = session.state.get("background_refresh")
+    if task is not None and not task.done():
+        return task
+    task = asyncio.create_task(work())
+    session.state["background_refresh"] = task
+    _background.add(task)
+    task.add_done_callback(_background_done)
+    return task
+
+
+def _background_done(task: asyncio.Task) -> None:
+    _background.discard(task)
+    if task.cancelled() or task.exception() is None:
+        return
+    exc = task.exception()
+    # A load shed by admission control is routine under load, not a failure
+    if isinstance(exc, HTTPException) and exc.status_code == 503:
+        logger.debug("Background load shed: %s", exc.detail)
+    else:
+        logger.warning("Background load failed: %r", exc)
+
+
+async def refresh_snapshot(
+    session: UserSession, fields: FieldSet, order: str
+) -> List[PRResponse]:
+    # Cards are published under session.state["loading"] as they finish, for
+    # deadline-bounded requests that can't wait for the whole queue
+    key = queue_key(fields, order)
+    progress: List[CardJob] = []
+    loading = session.state.setdefault("loading", {})
+    loading[key] = progress
+    try:
+        cards = await load_all_prs(
+            session.client,
+            get_refresh_engine(session),
+            fields,
+            order=order,
+            progress=progress,
+        )
+    finally:
+        if loading.get(key) is progress:
+            del loading[key]
+    snapshot = session_snapshot(session, fields, order, used=False)
+    if snapshot is not None:
+        snapshot.update(cards)
+    return cards
+
+
+class QueueLoad:
+    """
+    The one full load of a session's queue in flight, whether a request or
+    a background refresh started it; requests for the same queue join it
+    rather than starting another fan-out. It is cancelled once every
+    request waiting on it has disconnected, unless it is detached: a
+    background refresh needs its result, or a deadline-bounded request
+    left it to finish.
+    """
+
+    __slots__ = ("task", "waiters", "detached")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+        self.detached = False
+
+
+def start_queue_load(
+    session: UserSession, fields: FieldSet, order: str, background: bool = False
+) -> QueueLoad:
+    # Background loads skip admission control; they are already capped by
+    # the warm-up slots and have no client to shed
+    loads = session.state.setdefault("loads", {})
+    key = queue_key(fields, order)
+    load = loads.get(key)
+    if load is not None and not load.task.done():
+        load.detached = load.detached or background
+        return load
+    if background:
+        load = QueueLoad(asyncio.create_task(refresh_snapshot(session, fields, order)))
+        load.detached = True
+    else:
+        load = QueueLoad(asyncio.create_task(admitted_refresh(session, fields, order)))
+    loads[key] = load
+    _background.add(load.task)
+    load.task.add_done_callback(_background_done)
+    load.task.add_done_callback(
+        lambda _: loads.pop(key) if loads.get(key) is load else None
+    )
+    return load
 
 
-def get_github_client(request: Request) -> GitHubClient:
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-        from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+async def admitted_refresh(
+    session: UserSession, fields: FieldSet, order: str
+) -> List[PRResponse]:
+    async with admission.admit():
+        return await refresh_snapshot(session, fields, order)
 
-        try:
-            session_data = URLSafeTimedSerializer(settings.SECRET_KEY).loads(
-                token, max_age=7 * 24 * 60 * 60
-            )
-            return GitHubClient(session_data["github_token"])
-        except (BadSignature, SignatureExpired):
-            pass
 
-    session = require_auth(request)
-    return GitHubClient(session["github_token"])
+async def join_queue_load(
+    load: QueueLoad, request: Optional[Request], deadline: Optional[float] = None
+) -> bool:
+    """
+    Waits for the load to fill the snapshot. Returns False if the deadline
+    passed first; the load then carries on and the next request (or a diff
+    from the partial snapshot) picks it up.
+    """
+    load.waiters += 1
+    try:
+        if deadline is None:
+            await wait_unless_disconnected(load.task, request)
+            return True
+        timeout = max(deadline - time.monotonic(), 0)
+        done, _ = await asyncio.wait({load.task}, timeout=timeout)
+        if not done:
+            load.detached = True
+            return False
+        load.task.result()
+        return True
+    finally:
+        load.waiters -= 1
+        if not load.waiters and not load.detached and not load.task.done():
+            load.task.cancel()
+
+
+def publish_partial(
+    session: UserSession, fields: FieldSet, order: str, snapshot: PRSnapshot
+) -> None:
+    # Whatever the running load has finished joins the snapshot, ranked
+    # among itself; nothing is removed until the load completes
+    progress = session.state.get("loading", {}).get(queue_key(fields, order), [])
+    snapshot.update(
+        rank_cards([job for job in progress if job.card is not None], order),
+        complete=False,
+    )
+
+
+def discard_card(session: UserSession, repo: str, number: int) -> None:
+    for snapshot in session.state.get("snapshots", {}).values():
+        snapshot.discard(repo, number)
+    forget_responses(session)
+
+
+def get_refresh_engine(
+    session: UserSession = Depends(get_user_session),
+) -> RefreshEngine:
+    engine = session.state.get("refresh_engine")
+    if engine is None:
+        engine = session.state["refresh_engine"] = RefreshEngine(session.client)
+    return engine
+
+
+async def run_pipeline(
+    pipeline: Pipeline, items: list, request: Optional[Request]
+) -> List[CardJob]:
+    try:
+        return await pipeline.run(items, request)
+    finally:
+        pipeline_metrics.record("details", pipeline)
 
 
 @router.get("", response_model=List[PRResponse])
 async def list_prs(
     request: Request,
     repo: str = Query(..., description="Repository in format owner/repo"),
+    fields: FieldSet = Depends(get_field_set),
+    session: UserSession = Depends(get_user_session),
     client: GitHubClient = Depends(get_github_client),
+    engine: RefreshEngine = Depends(get_refresh_engine),
 ):
     if "/" not in repo:
         raise HTTPException(
@@ -52,305 +289,262 @@ async def list_prs(
 
     owner, repo_name = repo.split("/", 1)
 
-    try:
-        repo_data = await client.get_repo(owner, repo_name)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Repository not found: {str(e)}")
+    await require_push_access(client, owner, repo_name, "merge")
 
-    permissions = repo_data.get("permissions", {})
-    if not permissions.get("push", False) and not permissions.get("admin", False):
-        raise HTTPException(
-            status_code=403,
-            detail="You don't have permission to merge PRs in this repository.",
-        )
+    cached = cached_response(session, request)
+    if cached is not None:
+        return cached
 
-    prs_data = await client.list_open_prs_with_details(owner, repo_name)
+    body = await load_repo_prs(client, engine, repo, fields, request)
+    return store_response(session, request, body)
 
-    if not prs_data:
-        return []
 
-    author_logins = list(
-        set(pr.get("user", {}).get("login", "") for pr in prs_data if pr.get("user"))
-    )
-    author_details = {}
-    for login in author_logins:
-        try:
-            user_data = await client.get_user(login)
-            author_details[login] = user_data
-        except Exception:
-            author_details[login] = {
-                "login": login,
-                "avatar_url": "",
-                "html_url": "",
-                "name": None,
-                "bio": None,
-                "public_repos": 0,
-                "followers": 0,
-            }
+async def load_repo_prs(
+    client: GitHubClient,
+    engine: RefreshEngine,
+    repo: str,
+    fields: FieldSet = FULL,
+    request: Optional[Request] = None,
+) -> bytes:
+    builder = CardBuilder(client, engine, fields)
+    pipeline = Pipeline([builder.list_stage(), *builder.card_stages()])
+    try:
+        async with admission.admit():
+            jobs = await pipeline.run([(repo, None)], request)
+        jobs.sort(key=lambda job: job.order)
+        with pipeline.timed("serialize"):
+            return PR_LIST.dump_json([job.card for job in jobs], include=fields.include)
+    finally:
+        pipeline_metrics.record("repo", pipeline)
 
-    prs = []
-    for pr in prs_data:
-        author_login = pr.get("user", {}).get("login", "")
-        author_info = author_details.get(author_login, {})
 
-        files_data = await client.get_pull_request_files(owner, repo_name, pr["number"])
-        additions = sum(f.get("additions", 0) for f in files_data)
-        deletions = sum(f.get("deletions", 0) for f in files_data)
-        changed_files = len(files_data)
+@router.get("/all", response_model=List[PRResponse])
+async def get_all_prs(
+    request: Request,
+    fields: FieldSet = Depends(get_field_set),
+    order: str = Depends(get_queue_order),
+    deadline: Optional[float] = Depends(get_deadline),
+    session: UserSession = Depends(get_user_session),
+):
+    snapshot = session_snapshot(session, fields, order)
+    # A fresh snapshot is served (or answered with 304) as is, without
+    # re-running discovery and enrichment; a stale one waits, up to the
+    # deadline, for the load of this queue already running (a background
+    # refresh included) or starts one
+    headers = {}
+    if not snapshot.is_fresh():
+        load = start_queue_load(session, fields, order)
+        if not await join_queue_load(load, request, deadline):
+            publish_partial(session, fields, order, snapshot)
+            headers = {
+                QUEUE_COMPLETE_HEADER: "false",
+                CONTINUATION_HEADER: snapshot.token,
+            }
+    body = snapshot.body()
+    return etag_response(
+        request,
+        body,
+        compute_etag(body),
+        headers={SNAPSHOT_VERSION_HEADER: snapshot.token, **headers},
+    )
 
-        commits_data = await client.get_pull_request_commits(
-            owner, repo_name, pr["number"]
-        )
-        commits = len(commits_data)
 
-        reviews_data = await client.get_pull_request_reviews(
-            owner, repo_name, pr["number"]
-        )
-        review_comments = len(reviews_data)
+@router.get("/all/changes", response_model=PRChangesResponse)
+async def get_all_pr_changes(
+    request: Request,
+    since: Optional[str] = Query(None, description="Snapshot version token"),
+    fields: FieldSet = Depends(get_field_set),
+    order: str = Depends(get_queue_order),
+    session: UserSession = Depends(get_user_session),
+    snapshot: PRSnapshot = Depends(get_snapshot),
+):
+    if not snapshot.is_fresh():
+        await join_queue_load(start_queue_load(session, fields, order), request)
+    changes = snapshot.changes_since(since)
+    if fields.include is None:
+        return changes
+    return Response(
+        content=changes.model_dump_json(
+            include={
+                "version": True,
+                "reset": True,
+                "removed": True,
+                "added": fields.include,
+                "changed": fields.include,
+            }
+        ),
+        media_type="application/json",
+    )
 
-        comments_data = await client.get_pull_request_comments(
-            owner, repo_name, pr["number"]
-        )
-        comments = len(comments_data) if isinstance(comments_data, list) else 0
-
-        requested_reviewers = [
-            r.get("login", "") for r in pr.get("requested_reviewers", [])
-        ]
-        labels = [l.get("name", "").lower() for l in pr.get("labels", [])]
-
-        created_at = datetime.fromisoformat(pr["created_at"].replace("Z", "+00:00"))
-        updated_at = datetime.fromisoformat(pr["updated_at"].replace("Z", "+00:00"))
-        age_days = (datetime.now(timezone.utc) - created_at).days
-
-        generated_bio = generate_pr_bio(
-            additions=additions,
-            deletions=deletions,
-            changed_files=changed_files,
-            commits=commits,
-            age_days=age_days,
-            draft=pr.get("draft", False),
-            labels=labels,
-            requested_reviewers=requested_reviewers,
-        )
 
-        compatibility_score = compute_compatibility_score(
-            mergeable=pr.get("mergeable", False),
-            age_days=age_days,
-            draft=pr.get("draft", False),
-            commits=commits,
-            changed_files=changed_files,
-            comments=comments + review_comments,
+def snapshot_count(session: UserSession, repo: Optional[str]) -> Optional[int]:
+    # From the most recently refreshed queue, if it is still fresh
+    fresh = [
+        snapshot
+        for snapshot in session.state.get("snapshots", {}).values()
+        if snapshot.is_fresh()
+    ]
+    if not fresh:
+        return None
+    snapshot = max(fresh, key=lambda snapshot: snapshot.refreshed_at)
+    if repo is None:
+        return len(snapshot.entries)
+    return sum(1 for name, _ in snapshot.entries if name.lower() == repo.lower())
+
+
+@router.get("/count", response_model=PRCountResponse)
+async def count_prs(
+    repo: Optional[str] = Query(
+        None, description="Repository in format owner/repo; all repos if omitted"
+    ),
+    session: UserSession = Depends(get_user_session),
+    client: GitHubClient = Depends(get_github_client),
+    engine: RefreshEngine = Depends(get_refresh_engine),
+):
+    # Answered from what the session already knows where it can be, and
+    # otherwise from search total_counts; never lists or enriches a PR
+    if repo is not None and "/" not in repo:
+        raise HTTPException(
+            status_code=400, detail="Invalid repo format. Use owner/repo"
         )
-
-        prs.append(
-            PRResponse(
-                number=pr["number"],
-                title=pr["title"],
-                body=pr.get("body"),
-                html_url=pr["html_url"],
-                head_branch=pr.get("head", {}).get("ref", ""),
-                base_branch=pr.get("base", {}).get("ref", ""),
-                repo=repo,
-                author=PRAuthor(
-                    login=author_login,
-                    avatar_url=author_info.get("avatar_url", ""),
-                    html_url=author_info.get("html_url", ""),
-                    name=author_info.get("name"),
-                    bio=author_info.get("bio"),
-                    public_repos=author_info.get("public_repos", 0),
-                    followers=author_info.get("followers", 0),
-                ),
-                stats=PRStats(
-                    additions=additions,
-                    deletions=deletions,
-                    changed_files=changed_files,
-                    commits=commits,
-                    comments=comments,
-                    review_comments=review_comments,
-                    requested_reviewers=requested_reviewers,
-                    labels=labels,
-                    mergeable=pr.get("mergeable"),
-                    draft=pr.get("draft", False),
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    age_days=age_days,
-                ),
-                generated_bio=generated_bio,
-                compatibility_score=compatibility_score,
+    count = snapshot_count(session, repo)
+    if count is not None:
+        return PRCountResponse(count=count, repo=repo, source="snapshot")
+    count = engine.open_pr_count(repo)
+    if count is not None:
+        return PRCountResponse(count=count, repo=repo, source="index")
+
+    if repo is not None:
+        queries = [f"{BASE_QUERY} repo:{repo}"]
+    elif engine.count_queries is not None:
+        # Only the repos the user can push to, as discovery saw them
+        queries = engine.count_queries
+    else:
+        # Nothing has listed the user's repos yet; finding them here would
+        # cost a listing plus searches, so the count waits for a load
+        return PRCountResponse(count=None, repo=repo, source="unknown")
+    counts = await asyncio.gather(
+        *(client.count_search_issues(query) for query in queries)
+    )
+    return PRCountResponse(count=sum(counts), repo=repo, source="search")
+
+
+async def load_all_prs(
+    client: GitHubClient,
+    engine: RefreshEngine,
+    fields: FieldSet = FULL,
+    request: Optional[Request] = None,
+    order: str = "random",
+    progress: Optional[List[CardJob]] = None,
+) -> List[PRResponse]:
+    builder = CardBuilder(client, engine, fields, strict=False)
+    pipeline = Pipeline(
+        [builder.discover_stage(), builder.list_stage(), *builder.card_stages()]
+    )
+    try:
+        jobs = await pipeline.run([None], request, progress)
+        # Repos that no longer have open PRs (or lost push access) are dropped
+        engine.retain(builder.seen_repos)
+        with pipeline.timed("rank"):
+            pr_responses = rank_cards(
+                [job for job in jobs if job.card is not None], order
             )
-        )
-
-    return prs
+    finally:
+        pipeline_metrics.record("all", pipeline)
+    return pr_responses
 
 
-@router.get("/all", response_model=List[PRResponse])
-async def get_all_prs(
+@router.post("/details", response_model=PRDetailsResponse)
+async def get_prs_details(
     request: Request,
+    body: PRDetailsRequest,
+    fields: FieldSet = Depends(get_field_set),
     client: GitHubClient = Depends(get_github_client),
+    engine: RefreshEngine = Depends(get_refresh_engine),
 ):
-    repos_data = await client.list_repos(per_page=100)
-
-    print(f"[DEBUG] Total repos fetched: {len(repos_data)}")
-
-    # Debug: print first repo's permissions structure
-    if repos_data:
-        first_repo = repos_data[0]
-        print(f"[DEBUG] First repo: {first_repo.get('full_name')}")
-        print(f"[DEBUG] Permissions: {first_repo.get('permissions')}")
-
-    push_repos = [
-        (repo["owner"]["login"], repo["name"])
-        for repo in repos_data
-        if repo.get("permissions", {}).get("push", False)
-        or repo.get("permissions", {}).get("admin", False)
-    ]
-
-    print(f"[DEBUG] Repos with push/admin: {len(push_repos)}")
-    print(f"[DEBUG] Push repos: {push_repos[:5]}")  # Print first 5
-
-    all_prs = []
-    for owner, repo_name in push_repos:
-        try:
-            prs = await client.list_open_prs_with_details(owner, repo_name)
-            print(f"[DEBUG] Repo {owner}/{repo_name}: {len(prs)} open PRs")
-            for pr in prs:
-                pr["_repo"] = f"{owner}/{repo_name}"
-            all_prs.extend(prs)
-        except Exception as e:
-            print(f"[DEBUG] Error fetching PRs from {owner}/{repo_name}: {e}")
-            continue
-
-    print(f"[DEBUG] Total PRs found: {len(all_prs)}")
-
-    if not all_prs:
-        print("[DEBUG] No PRs found, returning empty list")
-        return []
-
-    random.shuffle(all_prs)
-
-    author_logins = list(
-        set(pr.get("user", {}).get("login", "") for pr in all_prs if pr.get("user"))
+    # Cards that can't be loaded (no access, closed or gone since) get their
+    # own status instead of failing the whole batch
+    response = PRDetailsResponse(
+        results=await load_pr_details(client, engine, body.prs, fields, request)
     )
-    print(f"[DEBUG] Author logins to fetch: {author_logins}")
-
-    author_details = {}
-    for login in author_logins:
-        try:
-            user_data = await client.get_user(login)
-            author_details[login] = user_data
-        except Exception as e:
-            print(f"[DEBUG] Error fetching user {login}: {e}")
-            author_details[login] = {
-                "login": login,
-                "avatar_url": "",
-                "html_url": "",
-                "name": None,
-                "bio": None,
-                "public_repos": 0,
-                "followers": 0,
+    if fields.include is None:
+        return response
+    return Response(
+        content=response.model_dump_json(
+            include={
+                "results": {
+                    "__all__": {
+                        "repo": True,
+                        "number": True,
+                        "status": True,
+                        "error": True,
+                        "pr": fields.include["__all__"],
+                    }
+                }
             }
+        ),
+        media_type="application/json",
+    )
 
-    print(f"[DEBUG] Author details fetched: {len(author_details)}")
-
-    pr_responses = []
-    for pr in all_prs:
-        repo_full = pr.get("_repo", "")
-        if "/" not in repo_full:
-            continue
-        owner, repo_name = repo_full.split("/", 1)
-
-        author_login = pr.get("user", {}).get("login", "")
-        author_info = author_details.get(author_login, {})
-
-        files_data = await client.get_pull_request_files(owner, repo_name, pr["number"])
-        additions = sum(f.get("additions", 0) for f in files_data)
-        deletions = sum(f.get("deletions", 0) for f in files_data)
-        changed_files = len(files_data)
 
-        commits_data = await client.get_pull_request_commits(
-            owner, repo_name, pr["number"]
-        )
-        commits = len(commits_data)
-
-        reviews_data = await client.get_pull_request_reviews(
-            owner, repo_name, pr["number"]
+async def load_pr_details(
+    client: GitHubClient,
+    engine: RefreshEngine,
+    keys: List[PRKey],
+    fields: FieldSet = FULL,
+    request: Optional[Request] = None,
+) -> List[PRDetailsResult]:
+    # Hydration wants the card now, not once GitHub has computed mergeability
+    builder = CardBuilder(
+        client, engine, fields, strict=False, wait_for_mergeable=False
+    )
+    pipeline = Pipeline([builder.access_stage(), *builder.card_stages()])
+    unique = dict.fromkeys((key.repo, key.number) for key in keys)
+    jobs = await run_pipeline(
+        pipeline, [builder.job(repo, number) for repo, number in unique], request
+    )
+    jobs.sort(key=lambda job: job.order)
+    return [
+        PRDetailsResult(
+            repo=job.repo,
+            number=job.number,
+            status=job.status,
+            error=job.error,
+            pr=job.card,
         )
-        review_comments = len(reviews_data)
+        for job in jobs
+    ]
 
-        comments_data = await client.get_pull_request_comments(
-            owner, repo_name, pr["number"]
-        )
-        comments = len(comments_data) if isinstance(comments_data, list) else 0
-
-        requested_reviewers = [
-            r.get("login", "") for r in pr.get("requested_reviewers", [])
-        ]
-        labels = [l.get("name", "").lower() for l in pr.get("labels", [])]
-
-        created_at = datetime.fromisoformat(pr["created_at"].replace("Z", "+00:00"))
-        updated_at = datetime.fromisoformat(pr["updated_at"].replace("Z", "+00:00"))
-        age_days = (datetime.now(timezone.utc) - created_at).days
-
-        generated_bio = generate_pr_bio(
-            additions=additions,
-            deletions=deletions,
-            changed_files=changed_files,
-            commits=commits,
-            age_days=age_days,
-            draft=pr.get("draft", False),
-            labels=labels,
-            requested_reviewers=requested_reviewers,
-        )
 
-        compatibility_score = compute_compatibility_score(
-            mergeable=pr.get("mergeable", False),
-            age_days=age_days,
-            draft=pr.get("draft", False),
-            commits=commits,
-            changed_files=changed_files,
-            comments=comments + review_comments,
-        )
+ALREADY_MERGED_MESSAGE = "This PR has already been merged."
+CLOSED_MESSAGE = "This PR is closed and cannot be merged."
+DRAFT_MESSAGE = "Cannot merge a draft PR. Please mark it as ready for review."
+CONFLICTS_MESSAGE = "This PR has merge conflicts. Please resolve them first."
+HEAD_MOVED_MESSAGE = (
+    "This PR received new commits since it was loaded. Refresh and review again."
+)
 
-        pr_responses.append(
-            PRResponse(
-                number=pr["number"],
-                title=pr["title"],
-                body=pr.get("body"),
-                html_url=pr["html_url"],
-                head_branch=pr.get("head", {}).get("ref", ""),
-                base_branch=pr.get("base", {}).get("ref", ""),
-                repo=repo_full,
-                author=PRAuthor(
-                    login=author_login,
-                    avatar_url=author_info.get("avatar_url", ""),
-                    html_url=author_info.get("html_url", ""),
-                    name=author_info.get("name"),
-                    bio=author_info.get("bio"),
-                    public_repos=author_info.get("public_repos", 0),
-                    followers=author_info.get("followers", 0),
-                ),
-                stats=PRStats(
-                    additions=additions,
-                    deletions=deletions,
-                    changed_files=changed_files,
-                    commits=commits,
-                    comments=comments,
-                    review_comments=review_comments,
-                    requested_reviewers=requested_reviewers,
-                    labels=labels,
-                    mergeable=pr.get("mergeable"),
-                    draft=pr.get("draft", False),
-                    created_at=created_at,
-                    updated_at=updated_at,
-                    age_days=age_days,
-                ),
-                generated_bio=generated_bio,
-                compatibility_score=compatibility_score,
-            )
-        )
 
-    print(f"[DEBUG] Returning {len(pr_responses)} PR responses")
-    return pr_responses
+def merge_rejection(pr_number: int, exc: GitHubAPIError) -> MergeResponse:
+    # Maps GitHub's typed PUT /merge failures (405/409/422) onto the same
+    # messages the preflight checks produce.
+    reason = str(exc).lower()
+    merged = False
+    if "already merged" in reason:
+        message, merged = ALREADY_MERGED_MESSAGE, True
+    elif "draft" in reason:
+        message = DRAFT_MESSAGE
+    elif exc.status_code == 409 or "head branch was modified" in reason:
+        message = HEAD_MOVED_MESSAGE
+    elif exc.status_code == 422 and "closed" in reason:
+        message = CLOSED_MESSAGE
+    elif exc.status_code == 405 and "not mergeable" in reason:
+        message = CONFLICTS_MESSAGE
+    else:
+        message = f"Failed to merge PR: {str(exc)}"
+    return MergeResponse(
+        success=False, message=message, pr_number=pr_number, merged=merged
+    )
 
 
 @router.post("/{pr_number}/merge", response_model=MergeResponse)
@@ -358,6 +552,7 @@ async def merge_pr(
     pr_number: int,
     request: Request,
     body: MergeRequest,
+    session: UserSession = Depends(get_user_session),
     client: GitHubClient = Depends(get_github_client),
 ):
     if "/" not in body.repo:
@@ -367,51 +562,50 @@ async def merge_pr(
 
     owner, repo_name = body.repo.split("/", 1)
 
-    try:
-        repo_data = await client.get_repo(owner, repo_name)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Repository not found: {str(e)}")
-
-    permissions = repo_data.get("permissions", {})
-    if not permissions.get("push", False) and not permissions.get("admin", False):
-        raise HTTPException(
-            status_code=403,
-            detail="You don't have permission to merge PRs in this repository.",
-        )
+    await require_push_access(client, owner, repo_name, "merge", urgent=True)
 
-    pr_data = await client.get_pull_request(owner, repo_name, pr_number)
-
-    if pr_data.get("merged", False):
-        return MergeResponse(
-            success=False,
-            message="This PR has already been merged.",
-            pr_number=pr_number,
-            merged=True,
-        )
+    # Without the head SHA the card was rendered from, fall back to refetching
+    # the PR and checking its state before attempting the merge.
+    if not body.sha:
+        try:
+            pr_data = await client.get_pull_request(
+                owner, repo_name, pr_number, urgent=True
+            )
+        except Exception as e:
+            await forget_permission_on_denial(client, body.repo, e)
+            raise
+
+        if pr_data.get("merged", False):
+            return MergeResponse(
+                success=False,
+                message=ALREADY_MERGED_MESSAGE,
+                pr_number=pr_number,
+                merged=True,
+            )
 
-    if pr_data.get("state") == "closed":
-        return MergeResponse(
-            success=False,
-            message="This PR is closed and cannot be merged.",
-            pr_number=pr_number,
-            merged=False,
-        )
+        if pr_data.get("state") == "closed":
+            return MergeResponse(
+                success=False,
+                message=CLOSED_MESSAGE,
+                pr_number=pr_number,
+                merged=False,
+            )
 
-    if pr_data.get("draft", False):
-        return MergeResponse(
-            success=False,
-            message="Cannot merge a draft PR. Please mark it as ready for review.",
-            pr_number=pr_number,
-            merged=False,
-        )
+        if pr_data.get("draft", False):
+            return MergeResponse(
+                success=False,
+                message=DRAFT_MESSAGE,
+                pr_number=pr_number,
+                merged=False,
+            )
 
-    if not pr_data.get("mergeable", True):
-        return MergeResponse(
-            success=False,
-            message="This PR has merge conflicts. Please resolve them first.",
-            pr_number=pr_number,
-            merged=False,
-        )
+        if not pr_data.get("mergeable", True):
+            return MergeResponse(
+                success=False,
+                message=CONFLICTS_MESSAGE,
+                pr_number=pr_number,
+                merged=False,
+            )
 
     try:
         merge_method = body.merge_method or settings.DEFAULT_MERGE_METHOD
@@ -422,14 +616,17 @@ async def merge_pr(
             merge_method=merge_method,
             commit_title=body.commit_title,
             commit_message=body.commit_message,
+            sha=body.sha,
         )
-        await client.create_issue_comment(owner, repo_name, pr_number, "LGTM")
+    except GitHubAPIError as e:
+        await forget_permission_on_denial(client, body.repo, e)
+        if e.status_code in (405, 409, 422):
+            return merge_rejection(pr_number, e)
         return MergeResponse(
-            success=True,
-            message="PR merged successfully!",
-            sha=result.get("sha"),
+            success=False,
+            message=f"Failed to merge PR: {str(e)}",
             pr_number=pr_number,
-            merged=True,
+            merged=False,
         )
     except Exception as e:
         return MergeResponse(
@@ -439,12 +636,28 @@ async def merge_pr(
             merged=False,
         )
 
+    try:
+        await client.create_issue_comment(owner, repo_name, pr_number, "LGTM")
+    except Exception as e:
+        print(f"[DEBUG] Merged PR #{pr_number} but failed to comment: {e}")
+
+    discard_card(session, body.repo, pr_number)
+
+    return MergeResponse(
+        success=True,
+        message="PR merged successfully!",
+        sha=result.get("sha"),
+        pr_number=pr_number,
+        merged=True,
+    )
+
 
 @router.post("/{pr_number}/close", response_model=CloseResponse)
 async def close_pr(
     pr_number: int,
     request: Request,
     body: CloseRequest,
+    session: UserSession = Depends(get_user_session),
     client: GitHubClient = Depends(get_github_client),
 ):
     if "/" not in body.repo:
@@ -454,33 +667,33 @@ async def close_pr(
 
     owner, repo_name = body.repo.split("/", 1)
 
-    try:
-        repo_data = await client.get_repo(owner, repo_name)
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"Repository not found: {str(e)}")
+    await require_push_access(client, owner, repo_name, "close", urgent=True)
 
-    permissions = repo_data.get("permissions", {})
-    if not permissions.get("push", False) and not permissions.get("admin", False):
-        raise HTTPException(
-            status_code=403,
-            detail="You don't have permission to close PRs in this repository.",
+    try:
+        # Only the state matters here, so no waiting for mergeability
+        pr_data = await client.get_pull_request(
+            owner, repo_name, pr_number, wait_for_mergeable=False, urgent=True
         )
 
-    pr_data = await client.get_pull_request(owner, repo_name, pr_number)
+        if pr_data.get("state") == "closed":
+            return CloseResponse(
+                success=True,
+                message="This PR is already closed.",
+                pr_number=pr_number,
+                state="closed",
+            )
 
-    if pr_data.get("state") == "closed":
-        return CloseResponse(
-            success=True,
-            message="This PR is already closed.",
-            pr_number=pr_number,
-            state="closed",
-        )
+        await client.close_pull_request(owner, repo_name, pr_number)
+    except Exception as e:
+        await forget_permission_on_denial(client, body.repo, e)
+        raise
 
-    await client.close_pull_request(owner, repo_name, pr_number)
     await client.create_issue_comment(
         owner, repo_name, pr_number, "Too much AI use. Closing."
     )
 
+    discard_card(session, body.repo, pr_number)
+
     return CloseResponse(
         success=True,
         message="PR closed successfully!",
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from api.fields import FULL
+from auth.permissions import check_push_access
+from cache.base import CacheBackend
+from cache.codec import decode_model_or_none, encode_model, schema_tag
+from cache.store import cache
+from config import settings
+from github.client import GitHubClient
+from github.records import PullRequestRecord
+from models.schemas import PRResponse
+
+T = TypeVar("T")
+
+
+class RepoCardCache:
+    """
+    Enriched PR data shared by every session with access to the repo:
+    finished cards keyed by repo, PR, updated_at and head SHA (no user in
+    the key), and the GitHub fetches behind them, which concurrent sessions
+    join instead of repeating. Every read first checks that the reading
+    user can push to the repo, so data fetched with one user's token is
+    never served to someone without access.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = settings.PR_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def key(repo: str, pr: PullRequestRecord, parts: str = FULL.parts) -> str:
+        # updated_at moves on pushes, comments, reviews and label changes, so
+        # a cached card is only reused while the PR itself is untouched
+        return (
+            f"pr:{schema_tag(PRResponse)}:{repo.lower()}#{pr.number}"
+            f":{pr.updated_at}:{pr.head_sha}:{parts}"
+        )
+
+    async def readable(self, client: GitHubClient, repo: str) -> bool:
+        # Served from the permission cache, which listings keep seeded
+        return await check_push_access(client, repo) is None
+
+    async def get(
+        self, client: GitHubClient, repo: str, pr: PullRequestRecord, parts: str
+    ) -> Optional[PRResponse]:
+        if not await self.readable(client, repo):
+            return None
+        # A full card satisfies any narrower request, so it is tried second
+        for key in dict.fromkeys((self.key(repo, pr, parts), self.key(repo, pr))):
+            card = decode_model_or_none(PRResponse, await self.backend.get(key))
+            if card is not None:
+                return card
+        return None
+
+    async def store(
+        self, repo: str, pr: PullRequestRecord, parts: str, card: PRResponse
+    ) -> None:
+        await self.backend.set(self.key(repo, pr, parts), encode_model(card), self.ttl)
+
+    async def fetch(
+        self,
+        client: GitHubClient,
+        repo: str,
+        key: str,
+        fetch: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Runs fetch once for everyone asking for the same key at the same
+        time. Callers without access to the repo fetch on their own.
+        """
+        if not await self.readable(client, repo):
+            return await fetch()
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(fetch())
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # One caller going away doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Retrieved here in case every caller had already gone
+            task.exception()
+
+
+repo_cache = RepoCardCache(cache)
@@ -2,31 +2,17 @@ from typing import List
 from datetime import datetime
 
 from fastapi import APIRouter, Query, Request, Depends
+from pydantic import TypeAdapter
 
-from auth.session import require_auth
+from api.etag import cached_response, store_response
+from auth.permissions import permission_cache, has_push_access
+from auth.session import UserSession, get_github_client, get_user_session
 from github.client import GitHubClient
 from models.schemas import RepoResponse, RepoPermissions
-from config import settings
 
 router = APIRouter(prefix="/api/repos", tags=["repos"])
 
-
-def get_github_client(request: Request) -> GitHubClient:
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-        from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-
-        try:
-            session_data = URLSafeTimedSerializer(settings.SECRET_KEY).loads(
-                token, max_age=7 * 24 * 60 * 60
-            )
-            return GitHubClient(session_data["github_token"])
-        except (BadSignature, SignatureExpired):
-            pass
-
-    session = require_auth(request)
-    return GitHubClient(session["github_token"])
+REPO_LIST = TypeAdapter(List[RepoResponse])
 
 
 @router.get("", response_model=List[RepoResponse])
@@ -36,19 +22,25 @@ async def list_repos(
     per_page: int = Query(30, ge=1, le=100),
     sort: str = Query("full_name", pattern="^(full_name|created|updated|pushed)$"),
     affiliation: str = Query("owner,collaborator,organization_member"),
+    session: UserSession = Depends(get_user_session),
     client: GitHubClient = Depends(get_github_client),
 ):
+    cached = cached_response(session, request)
+    if cached is not None:
+        return cached
+
     repos_data = await client.list_repos(
         page=page,
         per_page=per_page,
         sort=sort,
         affiliation=affiliation,
     )
+    await permission_cache.seed(client.identity, repos_data)
 
     repos = []
     for repo in repos_data:
         permissions = repo.get("permissions", {})
-        if not permissions.get("push", False) and not permissions.get("admin", False):
+        if not has_push_access(repo):
             continue
 
         open_prs_count = 0
@@ -85,7 +77,7 @@ async def list_repos(
             )
         )
 
-    return repos
+    return store_response(session, request, REPO_LIST.dump_json(repos))
 
 
 @router.get("/search", response_model=List[RepoResponse])
@@ -95,11 +87,12 @@ async def search_repos(
     client: GitHubClient = Depends(get_github_client),
 ):
     repos_data = await client.search_repos(q)
+    await permission_cache.seed(client.identity, repos_data)
 
     repos = []
     for repo in repos_data:
         permissions = repo.get("permissions", {})
-        if not permissions.get("push", False) and not permissions.get("admin", False):
+        if not has_push_access(repo):
             continue
 
         open_prs_count = 0
@@ -0,0 +1,91 @@
+import asyncio
+import random
+import time
+from typing import Optional
+
+from api.warmup import start_refresh
+from auth.session import UserSession, session_registry
+from config import settings
+
+
+def within_rate_limit_budget(session: UserSession, now: float) -> bool:
+    # Background work never eats into the calls kept for the user's own
+    # requests; once the window resets the budget is full again
+    client = session.client
+    if client.rate_limit_remaining is None or client.rate_limit_reset is None:
+        return True
+    if client.rate_limit_reset <= now:
+        return True
+    return client.rate_limit_remaining >= settings.SCHEDULER_RATE_LIMIT_FLOOR
+
+
+def refresh_interval(idle: float) -> float:
+    # Someone swiping right now gets the minimum interval; the longer they
+    # have been away, the less often their queue is rebuilt
+    interval = min(
+        max(idle, settings.scheduler_min_interval), settings.SCHEDULER_MAX_INTERVAL
+    )
+    return interval * random.uniform(0.9, 1.1)
+
+
+class RefreshScheduler:
+    """
+    Rebuilds the PR queues of recently active sessions in the background,
+    so their requests find fresh snapshots, a warm refresh engine and cached
+    cards instead of paying for discovery themselves. The most recently
+    active sessions go first; all refreshes share the warm-up slots.
+    """
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.SCHEDULER_TICK * random.uniform(0.8, 1.2))
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[DEBUG] Scheduler tick failed: {e}")
+
+    def due(self, now: float) -> list[UserSession]:
+        sessions = []
+        for session in session_registry.active():
+            if now - session.last_seen > settings.SCHEDULER_IDLE_CUTOFF:
+                continue
+            # Only queues the user has actually asked for are kept warm
+            if not session.state.get("queues"):
+                continue
+            if now < session.state.get("refresh_due", 0):
+                continue
+            if not within_rate_limit_budget(session, now):
+                continue
+            sessions.append(session)
+        sessions.sort(key=lambda session: session.last_seen, reverse=True)
+        return sessions
+
+    def tick(self) -> list[asyncio.Task]:
+        # Refreshes run on their own; a slow one doesn't hold up the next
+        # tick, and one already running for a session isn't started twice
+        now = time.time()
+        tasks = []
+        for session in self.due(now):
+            session.state["refresh_due"] = now + refresh_interval(
+                now - session.last_seen
+            )
+            # Only the queues used last; older ones wait for a request
+            queues = list(session.state["queues"].values())
+            queues = queues[-settings.SCHEDULER_MAX_QUEUES :]
+            tasks.append(start_refresh(session, queues))
+        return tasks
+
+
+scheduler = RefreshScheduler()
@@ -0,0 +1,69 @@
+import asyncio
+import time
+
+from api.fields import FULL, SUMMARY, FieldSet
+from api.prs import (
+    get_refresh_engine,
+    load_pr_details,
+    session_snapshot,
+    start_background_refresh,
+    start_queue_load,
+)
+from auth.session import UserSession
+from config import settings
+from models.schemas import PRKey
+
+# What the swipe page asks for first: a score-ranked summary queue whose
+# leading cards it then hydrates
+WARMUP_FIELDS = SUMMARY
+WARMUP_ORDER = "score"
+
+_slots = asyncio.Semaphore(settings.WARMUP_CONCURRENCY)
+
+
+def start_warmup(session: UserSession) -> asyncio.Task:
+    # Registered up front, as the queue the user is about to open
+    session_snapshot(session, WARMUP_FIELDS, WARMUP_ORDER)
+    return start_refresh(session, [(WARMUP_FIELDS, WARMUP_ORDER)])
+
+
+def start_refresh(
+    session: UserSession, queues: list[tuple[FieldSet, str]]
+) -> asyncio.Task:
+    return start_background_refresh(session, lambda: refresh_queues(session, queues))
+
+
+async def refresh_queues(
+    session: UserSession, queues: list[tuple[FieldSet, str]]
+) -> None:
+    login = (session.user or {}).get("login")
+    requested = time.monotonic()
+    # Queues are only registered as loading once a slot is free, so a
+    # request for one never waits behind other users' refreshes; it loads
+    # the queue itself and this refresh then skips it
+    async with _slots:
+        for fields, order in queues:
+            snapshot = session_snapshot(session, fields, order, used=False)
+            # Dropped since the refresh was asked for, or already rebuilt
+            if snapshot is None or (
+                snapshot.refreshed_at is not None and snapshot.refreshed_at >= requested
+            ):
+                continue
+            try:
+                await warm_queue(session, fields, order)
+            except Exception as e:
+                print(f"[DEBUG] Background refresh failed for {login}: {e}")
+
+
+async def warm_queue(session: UserSession, fields: FieldSet, order: str) -> int:
+    load = start_queue_load(session, fields, order, background=True)
+    cards = await asyncio.shield(load.task)
+    if not fields.needs_stats:
+        # Full cards land in the card cache, where hydration finds them
+        first_page = [
+            PRKey(repo=card.repo, number=card.number)
+            for card in cards[: settings.RANKED_PAGE_SIZE]
+        ]
+        engine = get_refresh_engine(session)
+        await load_pr_details(session.client, engine, first_page, FULL)
+    return len(cards)
@@ -0,0 +1,113 @@
+from typing import Optional
+
+from fastapi import HTTPException
+
+from cache.base import CacheBackend
+from cache.store import cache
+from config import settings
+from github.client import GitHubAPIError, GitHubClient, is_transient
+
+GRANTED = b"1"
+DENIED = b"0"
+
+
+def has_push_access(repo_data: dict) -> bool:
+    permissions = repo_data.get("permissions") or {}
+    return bool(permissions.get("push", False) or permissions.get("admin", False))
+
+
+class PermissionCache:
+    """
+    Remembers whether a user can merge/close PRs in a repo, keyed by
+    (client identity, repo full name). Seeded in bulk from /user/repos
+    listings so single-repo endpoints can skip the GET /repos/{owner}/{repo}
+    round trip.
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: int = settings.PERMISSION_CACHE_TTL):
+        self.backend = backend
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(identity: str, repo: str) -> str:
+        return f"perm:{identity}:{repo.lower()}"
+
+    async def get(self, identity: str, repo: str) -> Optional[bool]:
+        value = await self.backend.get(self._key(identity, repo))
+        if value is None:
+            return None
+        return value == GRANTED
+
+    async def store(self, identity: str, repo_data: dict) -> bool:
+        can_push = has_push_access(repo_data)
+        full_name = repo_data.get("full_name", "")
+        if full_name:
+            await self.backend.set(
+                self._key(identity, full_name),
+                GRANTED if can_push else DENIED,
+                self.ttl,
+            )
+        return can_push
+
+    async def seed(self, identity: str, repos_data: list[dict]) -> None:
+        await self.backend.set_many(
+            {
+                self._key(identity, repo["full_name"]): (
+                    GRANTED if has_push_access(repo) else DENIED
+                )
+                for repo in repos_data
+                if repo.get("full_name")
+            },
+            self.ttl,
+        )
+
+    async def invalidate(self, identity: str, repo: str) -> None:
+        await self.backend.delete(self._key(identity, repo))
+
+
+permission_cache = PermissionCache(cache)
+
+
+async def require_push_access(
+    client: GitHubClient, owner: str, repo_name: str, action: str, urgent: bool = False
+) -> None:
+    # urgent is for merges and closes, whose lookup shouldn't queue behind
+    # the user's own card loads
+    full_name = f"{owner}/{repo_name}"
+    can_push = await permission_cache.get(client.identity, full_name)
+    if can_push is None:
+        try:
+            repo_data = await client.get_repo(owner, repo_name, urgent=urgent)
+        except GitHubAPIError as e:
+            # Rate limits and outages keep their own status
+            if is_transient(e) or e.status_code == 429:
+                raise
+            raise HTTPException(
+                status_code=404, detail=f"Repository not found: {str(e)}"
+            )
+        can_push = await permission_cache.store(client.identity, repo_data)
+
+    if not can_push:
+        raise HTTPException(
+            status_code=403,
+            detail=f"You don't have permission to {action} PRs in this repository.",
+        )
+
+
+async def check_push_access(client: GitHubClient, repo: str) -> Optional[HTTPException]:
+    # require_push_access for batch callers that report denials per item
+    if "/" not in repo:
+        return HTTPException(
+            status_code=400, detail="Invalid repo format. Use owner/repo"
+        )
+    owner, repo_name = repo.split("/", 1)
+    try:
+        await require_push_access(client, owner, repo_name, "view")
+    except HTTPException as e:
+        return e
+    return None
+
+
+async def forget_permission_on_denial(client: GitHubClient, repo: str, exc: Exception):
+    if isinstance(exc, GitHubAPIError) and exc.status_code in (403, 404):
+        await permission_cache.invalidate(client.identity, repo)
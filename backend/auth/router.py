@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Request, Response, HTTPException
+from fastapi import APIRouter, Depends, Request, Response, HTTPException
 from starlette.responses import RedirectResponse
 from itsdangerous import URLSafeTimedSerializer
 
 from config import settings
-from auth.session import session_manager, require_auth
+from auth.session import (
+    UserSession,
+    get_user_session,
+    session_manager,
+    session_registry,
+)
 from auth.github_oauth import github_oauth
+from api.warmup import start_warmup
 from github.client import GitHubClient
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -54,9 +60,13 @@ async def callback(code: str, state: str, request: Request, response: Response):
         },
     }
 
-    from itsdangerous import URLSafeTimedSerializer
+    session_token = session_manager.serializer.dumps(session_data)
 
-    session_token = URLSafeTimedSerializer(settings.SECRET_KEY).dumps(session_data)
+    # Start discovering repos and PRs while the user is still being
+    # redirected, so the first cards are ready by the time they ask
+    session = session_registry.resolve(session_token)
+    if session is not None:
+        start_warmup(session)
 
     return RedirectResponse(
         url=f"{settings.FRONTEND_URL}/auth?token={session_token}", status_code=302
@@ -64,25 +74,14 @@ async def callback(code: str, state: str, request: Request, response: Response):
 
 
 @router.get("/me")
-async def get_me(request: Request):
-    auth_header = request.headers.get("Authorization")
-    if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header[7:]
-        from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
-
-        try:
-            session_data = URLSafeTimedSerializer(settings.SECRET_KEY).loads(
-                token, max_age=7 * 24 * 60 * 60
-            )
-            return session_data.get("user")
-        except (BadSignature, SignatureExpired):
-            pass
-
-    session = require_auth(request)
-    return session.get("user")
+async def get_me(session: UserSession = Depends(get_user_session)):
+    return session.user
 
 
 @router.post("/logout")
-async def logout(response: Response):
+async def logout(request: Request, response: Response):
+    token = session_manager.get_token(request)
+    if token:
+        session_registry.evict(token)
     session_manager.clear_session(response)
     return {"success": True}
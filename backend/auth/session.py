@@ -1,9 +1,13 @@
+import hashlib
+import time
+from collections import OrderedDict
 from typing import Optional
 
-from fastapi import Request, Response
+from fastapi import Depends, HTTPException, Request, Response
 from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
 
 from config import settings
+from github.client import GitHubClient
 
 
 class SessionManager:
@@ -36,6 +40,12 @@ class SessionManager:
         except (BadSignature, SignatureExpired):
             return None
 
+    def get_token(self, request: Request) -> Optional[str]:
+        auth_header = request.headers.get("Authorization")
+        if auth_header and auth_header.startswith("Bearer "):
+            return auth_header[7:]
+        return request.cookies.get(self.cookie_name)
+
     def clear_session(self, response: Response) -> None:
         response.delete_cookie(
             key=self.cookie_name,
@@ -48,6 +58,75 @@ class SessionManager:
 session_manager = SessionManager()
 
 
+class UserSession:
+    """
+    A verified session token together with the long-lived GitHubClient and
+    any per-user state hung off it. Lives in the registry until the token
+    expires, the user logs out or it falls off the LRU.
+    """
+
+    def __init__(self, data: dict, expires_at: float):
+        self.data = data
+        self.user = data.get("user")
+        self.expires_at = expires_at
+        self.last_seen = time.time()
+        self.client = GitHubClient(data["github_token"])
+        self.state: dict = {}
+
+    @property
+    def identity(self) -> str:
+        return self.client.identity
+
+
+class SessionRegistry:
+    def __init__(self, max_sessions: int = settings.SESSION_REGISTRY_SIZE):
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, UserSession] = OrderedDict()
+
+    @staticmethod
+    def _digest(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def resolve(self, token: str) -> Optional[UserSession]:
+        digest = self._digest(token)
+        now = time.time()
+        session = self._sessions.get(digest)
+        if session is not None:
+            if session.expires_at > now:
+                self._sessions.move_to_end(digest)
+                session.last_seen = now
+                return session
+            del self._sessions[digest]
+
+        try:
+            data, signed_at = session_manager.serializer.loads(
+                token, max_age=session_manager.max_age, return_timestamp=True
+            )
+        except (BadSignature, SignatureExpired):
+            return None
+        if not isinstance(data, dict) or "github_token" not in data:
+            return None
+
+        session = UserSession(data, signed_at.timestamp() + session_manager.max_age)
+        self._sessions[digest] = session
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return session
+
+    def evict(self, token: str) -> None:
+        self._sessions.pop(self._digest(token), None)
+
+    def active(self) -> list[UserSession]:
+        now = time.time()
+        expired = [k for k, s in self._sessions.items() if s.expires_at <= now]
+        for key in expired:
+            del self._sessions[key]
+        return list(self._sessions.values())
+
+
+session_registry = SessionRegistry()
+
+
 def get_current_user(request: Request) -> dict:
     session_data = session_manager.get_session(request)
     if not session_data or "github_token" not in session_data:
@@ -58,7 +137,24 @@ def get_current_user(request: Request) -> dict:
 def require_auth(request: Request) -> dict:
     session_data = session_manager.get_session(request)
     if not session_data or "github_token" not in session_data:
-        from fastapi import HTTPException
-
         raise HTTPException(status_code=401, detail="Not authenticated")
     return session_data
+
+
+def get_user_session(request: Request) -> UserSession:
+    token = session_manager.get_token(request)
+    session = session_registry.resolve(token) if token else None
+    if session is None:
+        # A bad bearer token may still come with a valid session cookie
+        cookie_token = request.cookies.get(session_manager.cookie_name)
+        if cookie_token and cookie_token != token:
+            session = session_registry.resolve(cookie_token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    return session
+
+
+def get_github_client(
+    session: UserSession = Depends(get_user_session),
+) -> GitHubClient:
+    return session.client
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import random
+import re
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+import httpx
+
+import github.client
+
+# Who a call is made on behalf of, so load runs can split upstream traffic
+# by endpoint; calls from tasks nobody labelled count as "background"
+caller: ContextVar[str] = ContextVar("caller", default="background")
+
+
+# Timestamps are relative to import time, so an unchanged PR keeps the same
+# updated_at (and cache keys) for the whole run
+STARTED = datetime.now(timezone.utc)
+
+
+def iso(days_ago: int) -> str:
+    moment = STARTED - timedelta(days=days_ago)
+    return moment.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+class FakeGitHub:
+    """
+    Serves the slice of the GitHub REST API the backend uses, with payloads
+    shaped (and roughly sized) like the real ones: nested head/base repos,
+    _links, long bodies and file patches. Installed as the transport of the
+    shared httpx client, so every GitHubClient talks to it.
+    """
+
+    def __init__(
+        self,
+        repos: int = 20,
+        prs_per_repo: int = 25,
+        files_per_pr: int = 12,
+        body_size: int = 4000,
+        latency: Optional[Callable[[], float]] = None,
+    ):
+        self.repos = [self._repo(i) for i in range(1, repos + 1)]
+        self.prs_per_repo = prs_per_repo
+        self.files_per_pr = files_per_pr
+        self.body = "Lorem ipsum dolor sit amet. " * (body_size // 28)
+        # Seconds to wait before each response; None answers immediately
+        self.latency = latency
+        self.calls = 0
+        self.calls_by_caller: Counter[str] = Counter()
+
+    def install(self) -> None:
+        github.client._http_client = httpx.AsyncClient(
+            transport=httpx.MockTransport(self.handle)
+        )
+
+    def _repo(self, i: int) -> dict:
+        full_name = f"acme/repo{i}"
+        return {
+            "id": i,
+            "node_id": f"R_{i:020d}",
+            "name": f"repo{i}",
+            "full_name": full_name,
+            "private": False,
+            "archived": False,
+            "owner": {
+                "login": "acme",
+                "id": 1,
+                "type": "Organization",
+                "avatar_url": "https://avatars.githubusercontent.com/u/1",
+                "html_url": "https://github.com/acme",
+            },
+            "html_url": f"https://github.com/{full_name}",
+            "description": "A repository used for benchmarking " * 3,
+            "permissions": {"admin": False, "push": True, "pull": True},
+            "created_at": iso(900),
+            "updated_at": iso(1),
+            "pushed_at": iso(1),
+            "open_issues_count": 0,
+            "stargazers_count": 42,
+            "language": "Python",
+            **{
+                f"{name}_url": f"https://api.github.com/repos/{full_name}/{name}"
+                for name in (
+                    "branches",
+                    "commits",
+                    "contents",
+                    "issues",
+                    "pulls",
+                    "releases",
+                    "tags",
+                    "trees",
+                    "hooks",
+                    "labels",
+                )
+            },
+        }
+
+    def _pull(self, repo: dict, number: int) -> dict:
+        url = f"https://api.github.com/repos/{repo['full_name']}/pulls/{number}"
+        return {
+            "url": url,
+            "id": number,
+            "node_id": f"PR_{number:020d}",
+            "number": number,
+            "state": "open",
+            "title": f"Change number {number}",
+            "body": self.body,
+            "html_url": f"https://github.com/{repo['full_name']}/pull/{number}",
+            "user": {"login": f"dev{number % 7}", "id": number % 7},
+            "created_at": iso(number % 30),
+            "updated_at": iso(0),
+            "draft": number % 5 == 0,
+            "mergeable": True,
+            "merged": False,
+            "labels": [{"name": "enhancement", "color": "a2eeef"}],
+            "requested_reviewers": [{"login": "reviewer"}],
+            "head": {
+                "ref": f"feature-{number}",
+                "sha": f"{number:040x}",
+                "repo": repo,
+            },
+            "base": {"ref": "main", "sha": "0" * 40, "repo": repo},
+            "_links": {
+                name: {"href": f"{url}/{name}"}
+                for name in ("self", "html", "issue", "comments", "commits")
+            },
+        }
+
+    def _page(self, request: httpx.Request, items: list) -> list:
+        per_page = int(request.url.params.get("per_page", 30))
+        page = int(request.url.params.get("page", 1))
+        return items[(page - 1) * per_page : page * per_page]
+
+    def _repo_named(self, full_name: str) -> Optional[dict]:
+        return next((r for r in self.repos if r["full_name"] == full_name), None)
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        self.calls_by_caller[caller.get()] += 1
+        if self.latency is not None:
+            await asyncio.sleep(self.latency())
+        return self._respond(request)
+
+    def _respond(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        headers = {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": "0"}
+
+        def respond(data, status: int = 200) -> httpx.Response:
+            return httpx.Response(status, content=json.dumps(data), headers=headers)
+
+        if path == "/user":
+            return respond({"login": "bench", "avatar_url": "", "html_url": ""})
+        if path == "/user/repos":
+            return respond(self._page(request, self.repos))
+        if m := re.fullmatch(r"/users/([\w-]+)", path):
+            return respond(
+                {
+                    "login": m[1],
+                    "avatar_url": "",
+                    "html_url": "",
+                    "name": m[1].title(),
+                    "bio": "Writes code.",
+                    "public_repos": 10,
+                    "followers": 5,
+                }
+            )
+        if path == "/search/issues":
+            # repo: qualifiers narrow the search; owner qualifiers match all
+            wanted = re.findall(r"repo:(\S+)", request.url.params.get("q", ""))
+            items = [
+                {
+                    "number": n,
+                    "repository_url": f"https://api.github.com/repos/{r['full_name']}",
+                }
+                for r in self.repos
+                if not wanted or r["full_name"] in wanted
+                for n in range(1, self.prs_per_repo + 1)
+            ]
+            return respond(
+                {
+                    "total_count": len(items),
+                    "incomplete_results": False,
+                    "items": self._page(request, items),
+                }
+            )
+        if m := re.fullmatch(r"/repos/([\w-]+/[\w-]+)", path):
+            repo = self._repo_named(m[1])
+            return respond(repo) if repo else respond({"message": "Not Found"}, 404)
+        if m := re.fullmatch(r"/repos/([\w-]+/[\w-]+)/pulls", path):
+            repo = self._repo_named(m[1])
+            pulls = [self._pull(repo, n) for n in range(1, self.prs_per_repo + 1)]
+            return respond(self._page(request, pulls))
+        if m := re.fullmatch(r"/repos/([\w-]+/[\w-]+)/pulls/(\d+)", path):
+            pull = self._pull(self._repo_named(m[1]), int(m[2]))
+            if request.method == "PATCH":
+                # Writes succeed but aren't kept, so the backlog never drains
+                pull.update(json.loads(request.content))
+            return respond(pull)
+        if re.fullmatch(r"/repos/[\w-]+/[\w-]+/pulls/\d+/merge", path):
+            return respond({"sha": "f" * 40, "merged": True, "message": "Merged"})
+        if re.fullmatch(r"/repos/[\w-]+/[\w-]+/issues/\d+/comments", path):
+            return respond({"id": random.randint(1, 2**31), "body": "LGTM"}, 201)
+        if re.fullmatch(r"/repos/[\w-]+/[\w-]+/pulls/\d+/files", path):
+            files = [
+                {
+                    "filename": f"src/module_{i}.py",
+                    "status": "modified",
+                    "additions": 10,
+                    "deletions": 3,
+                    "changes": 13,
+                    "patch": "@@ -1,3 +1,10 @@\n" + "+    line\n" * 40,
+                }
+                for i in range(self.files_per_pr)
+            ]
+            return respond(self._page(request, files))
+        if re.fullmatch(r"/repos/[\w-]+/[\w-]+/pulls/\d+/commits", path):
+            commits = [
+                {
+                    "sha": f"{i:040x}",
+                    "commit": {"message": "Commit message " * 5},
+                    "author": {"login": "dev"},
+                }
+                for i in range(3)
+            ]
+            return respond(self._page(request, commits))
+        if re.fullmatch(r"/repos/[\w-]+/[\w-]+/pulls/\d+/(reviews|comments)", path):
+            return respond(self._page(request, [{"id": 1, "body": "Looks good"}]))
+        return respond({"message": f"Not handled: {path}"}, 404)
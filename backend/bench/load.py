@@ -0,0 +1,281 @@
+"""
+Simulated reviewers swiping through their queues against the ASGI app and
+the fake GitHub, reporting per-endpoint latency, event-loop lag, memory
+growth and upstream call amplification.
+
+    cd backend && python -m bench.load --users 200 --duration 120
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import random
+import resource
+import time
+from collections import Counter, defaultdict
+from typing import Optional
+
+import httpx
+
+from api.warmup import start_warmup
+from auth.session import session_manager, session_registry
+from bench.fake_github import FakeGitHub, caller
+from main import app
+
+# Mirror the frontend: summary queue ranked by score, the next ten cards
+# hydrated ahead of the one on screen, a diff poll every minute
+QUEUE_PARAMS = {"view": "summary", "order": "score"}
+HYDRATE_AHEAD = 10
+LAG_INTERVAL = 0.05
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return math.nan
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def rss_mib() -> float:
+    try:
+        with open("/proc/self/statm") as statm:
+            pages = int(statm.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        # No procfs (macOS): fall back to the peak, which is in bytes there
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**20
+
+
+class LoadStats:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.lags: list[float] = []
+        self.rss: list[float] = []
+
+    def record(self, name: str, seconds: float, status: int) -> None:
+        self.latencies[name].append(seconds)
+        if status >= 400:
+            self.errors[name] += 1
+
+
+class Reviewer:
+    """
+    One simulated user: logs in, lists repos, loads the all-repos queue,
+    then swipes at a human cadence (hydrating ahead and polling for
+    changes) until the run ends.
+    """
+
+    def __init__(
+        self,
+        index: int,
+        http: httpx.AsyncClient,
+        stats: LoadStats,
+        args: argparse.Namespace,
+    ):
+        self.http = http
+        self.stats = stats
+        self.args = args
+        # A forged session: the same signed token the OAuth callback hands out
+        self.token = session_manager.serializer.dumps(
+            {"github_token": f"bench-{index}", "user": {"login": f"reviewer{index}"}}
+        )
+        self.queue: list[dict] = []
+        self.reviewed: set[tuple[str, int]] = set()
+        self.version: Optional[str] = None
+
+    async def call(
+        self, name: str, method: str, url: str, **kwargs
+    ) -> Optional[httpx.Response]:
+        caller.set(name)
+        start = time.perf_counter()
+        try:
+            response = await self.http.request(
+                method, url, headers={"Authorization": f"Bearer {self.token}"}, **kwargs
+            )
+        except httpx.HTTPError:
+            self.stats.record(name, time.perf_counter() - start, 599)
+            return None
+        self.stats.record(name, time.perf_counter() - start, response.status_code)
+        return response if response.is_success else None
+
+    async def load_queue(self) -> None:
+        response = await self.call(
+            "GET /api/prs/all", "GET", "/api/prs/all", params=QUEUE_PARAMS
+        )
+        if response is not None:
+            self.queue = response.json()
+            self.version = response.headers.get("X-Snapshot-Version")
+            await self.hydrate(self.queue[:HYDRATE_AHEAD])
+
+    async def hydrate(self, prs: list[dict]) -> None:
+        if prs:
+            body = {"prs": [{"repo": pr["repo"], "number": pr["number"]} for pr in prs]}
+            await self.call(
+                "POST /api/prs/details", "POST", "/api/prs/details", json=body
+            )
+
+    async def swipe(self, pr: dict) -> None:
+        self.reviewed.add((pr["repo"], pr["number"]))
+        if random.random() < self.args.merge_ratio:
+            body = {"repo": pr["repo"], "sha": pr["head_sha"]}
+            url = f"/api/prs/{pr['number']}/merge"
+            await self.call("POST /api/prs/{n}/merge", "POST", url, json=body)
+        else:
+            url = f"/api/prs/{pr['number']}/close"
+            await self.call(
+                "POST /api/prs/{n}/close", "POST", url, json={"repo": pr["repo"]}
+            )
+
+    async def refresh(self) -> None:
+        params = (
+            {**QUEUE_PARAMS, "since": self.version} if self.version else QUEUE_PARAMS
+        )
+        response = await self.call(
+            "GET /api/prs/all/changes", "GET", "/api/prs/all/changes", params=params
+        )
+        if response is not None:
+            changes = response.json()
+            self.version = changes["version"]
+            await self.apply(changes)
+
+    async def apply(self, changes: dict) -> None:
+        # As the frontend does: removed cards drop out, changed ones are
+        # swapped in place, new ones join the back unless already swiped,
+        # and any that land within the hydrate-ahead window are hydrated
+        def key(pr: dict) -> tuple[str, int]:
+            return (pr["repo"], pr["number"])
+
+        removed = {key(pr) for pr in changes["removed"]}
+        updates = {key(pr): pr for pr in changes["changed"]}
+        if changes["reset"]:
+            incoming = {key(pr): pr for pr in changes["added"]}
+            removed |= {key(pr) for pr in self.queue if key(pr) not in incoming}
+            updates.update(incoming)
+        self.queue = [
+            updates.get(key(pr), pr) for pr in self.queue if key(pr) not in removed
+        ]
+        present = {key(pr) for pr in self.queue}
+        added = [
+            pr
+            for pr in changes["added"]
+            if key(pr) not in present and key(pr) not in self.reviewed
+        ]
+        self.queue.extend(added)
+        added_keys = {key(pr) for pr in added}
+        await self.hydrate(
+            [pr for pr in self.queue[:HYDRATE_AHEAD] if key(pr) in added_keys]
+        )
+
+    async def run(self, stop_at: float) -> None:
+        await asyncio.sleep(random.uniform(0, self.args.ramp))
+        if self.args.warmup:
+            # What the OAuth callback does once the session exists
+            start_warmup(session_registry.resolve(self.token))
+        await self.call("GET /api/repos", "GET", "/api/repos")
+        await self.load_queue()
+        next_refresh = time.monotonic() + self.args.refresh
+        while time.monotonic() < stop_at:
+            await asyncio.sleep(random.expovariate(1 / self.args.think))
+            if time.monotonic() >= next_refresh:
+                await self.refresh()
+                next_refresh += self.args.refresh
+            if not self.queue:
+                await self.load_queue()
+                continue
+            await self.swipe(self.queue.pop(0))
+            if len(self.queue) >= HYDRATE_AHEAD:
+                await self.hydrate([self.queue[HYDRATE_AHEAD - 1]])
+
+
+async def watch_loop(stats: LoadStats, stop: asyncio.Event) -> None:
+    # How late a short sleep wakes up is how long callbacks wait to run
+    while not stop.is_set():
+        stats.rss.append(rss_mib())
+        start = time.perf_counter()
+        await asyncio.sleep(LAG_INTERVAL)
+        stats.lags.append(time.perf_counter() - start - LAG_INTERVAL)
+
+
+def report(stats: LoadStats, fake: FakeGitHub, elapsed: float) -> None:
+    print(
+        f"{'endpoint':<28}{'reqs':>7}{'errs':>6}{'p50 ms':>9}{'p95 ms':>9}"
+        f"{'p99 ms':>9}{'upstream/req':>14}"
+    )
+    total = 0
+    for name, latencies in sorted(stats.latencies.items()):
+        total += len(latencies)
+        ms = [seconds * 1000 for seconds in latencies]
+        upstream = fake.calls_by_caller[name] / len(latencies)
+        print(
+            f"{name:<28}{len(latencies):>7}{stats.errors[name]:>6}"
+            f"{percentile(ms, 0.5):>9.1f}{percentile(ms, 0.95):>9.1f}"
+            f"{percentile(ms, 0.99):>9.1f}{upstream:>14.2f}"
+        )
+    lags = [lag * 1000 for lag in stats.lags]
+    print(
+        f"\n{total} requests in {elapsed:.0f}s ({total / elapsed:.1f}/s), "
+        f"{fake.calls} upstream calls ({fake.calls / max(total, 1):.2f}/req, "
+        f"{fake.calls_by_caller['background']} from background work)"
+    )
+    print(
+        f"event-loop lag ms: p50 {percentile(lags, 0.5):.1f} "
+        f"p99 {percentile(lags, 0.99):.1f} max {max(lags, default=0):.1f}"
+    )
+    if stats.rss:
+        print(
+            f"rss MiB: start {stats.rss[0]:.0f} end {stats.rss[-1]:.0f} "
+            f"peak {max(stats.rss):.0f}"
+        )
+
+
+async def main(args: argparse.Namespace) -> None:
+    median = args.latency_ms / 1000
+    fake = FakeGitHub(
+        repos=args.repos,
+        prs_per_repo=args.prs,
+        latency=lambda: random.lognormvariate(math.log(median), args.latency_sigma),
+    )
+    stats = LoadStats()
+    stop = asyncio.Event()
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://bench") as http,
+    ):
+        fake.install()
+        watcher = asyncio.create_task(watch_loop(stats, stop))
+        start = time.monotonic()
+        stop_at = start + args.duration
+        reviewers = [Reviewer(i, http, stats, args) for i in range(args.users)]
+        await asyncio.gather(*(reviewer.run(stop_at) for reviewer in reviewers))
+        elapsed = time.monotonic() - start
+        stop.set()
+        await watcher
+    report(stats, fake, elapsed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds to log in")
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--prs", type=int, default=25, help="open PRs per repo")
+    parser.add_argument(
+        "--latency-ms", type=float, default=80, help="median GitHub latency"
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=0.6,
+        help="spread of the log-normal GitHub latency (0.6 puts p99 near 4x p50)",
+    )
+    parser.add_argument("--think", type=float, default=4, help="mean seconds per swipe")
+    parser.add_argument("--refresh", type=float, default=60, help="seconds per poll")
+    parser.add_argument("--merge-ratio", type=float, default=0.3)
+    parser.add_argument(
+        "--warmup", action="store_true", help="warm each queue at login"
+    )
+    asyncio.run(main(parser.parse_args()))
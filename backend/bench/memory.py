@@ -0,0 +1,55 @@
+"""
+Peak Python heap of one /api/prs/all load against the fake GitHub.
+
+    cd backend && python -m bench.memory --repos 40 --prs 50
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import secrets
+import tracemalloc
+
+from api.fields import FULL, SUMMARY, FieldSet
+from api.prs import load_all_prs
+from bench.fake_github import FakeGitHub
+from github.client import GitHubClient
+from github.refresh import RefreshEngine
+
+
+async def measure(fake: FakeGitHub, fields: FieldSet) -> tuple[int, int, int]:
+    # A fresh token per run so no run is served from another's card cache
+    client = GitHubClient(secrets.token_hex(8))
+    engine = RefreshEngine(client)
+    fake.calls = 0
+    tracemalloc.start()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cards = await load_all_prs(client, engine, fields)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return len(cards), peak, fake.calls
+
+
+async def main(args: argparse.Namespace) -> None:
+    fake = FakeGitHub(
+        repos=args.repos,
+        prs_per_repo=args.prs,
+        files_per_pr=args.files,
+        body_size=args.body_size,
+    )
+    fake.install()
+    print(f"{'view':<10}{'cards':>8}{'calls':>8}{'peak MiB':>11}{'KiB/card':>10}")
+    for name, fields in (("summary", SUMMARY), ("full", FULL)):
+        cards, peak, calls = await measure(fake, fields)
+        per_card = peak / 1024 / max(cards, 1)
+        print(f"{name:<10}{cards:>8}{calls:>8}{peak / 2**20:>11.1f}{per_card:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repos", type=int, default=20)
+    parser.add_argument("--prs", type=int, default=25, help="open PRs per repo")
+    parser.add_argument("--files", type=int, default=12, help="files per PR")
+    parser.add_argument("--body-size", type=int, default=4000)
+    asyncio.run(main(parser.parse_args()))
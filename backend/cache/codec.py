@@ -0,0 +1,99 @@
+import hashlib
+import json
+import types
+import zlib
+from typing import Any, Optional, Type, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# Payloads at least this large are zlib-compressed before caching
+COMPRESS_THRESHOLD = 512
+
+RAW = b"j"
+COMPRESSED = b"z"
+
+
+def dump_json(data: Any) -> bytes:
+    raw = json.dumps(data, separators=(",", ":"), default=str).encode()
+    if len(raw) >= COMPRESS_THRESHOLD:
+        return COMPRESSED + zlib.compress(raw)
+    return RAW + raw
+
+
+def load_json(blob: bytes) -> Any:
+    if blob[:1] == COMPRESSED:
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+
+def schema_tag(model: Type[BaseModel]) -> str:
+    """
+    Short fingerprint of a model's field layout. Cache keys include it so rows
+    written by an older schema are simply missed instead of mis-decoded.
+    """
+    return hashlib.sha1(",".join(_field_paths(model)).encode()).hexdigest()[:8]
+
+
+def encode_model(instance: BaseModel) -> bytes:
+    # Models are stored as positional rows (no field names) to keep entries
+    # small; decode_model relies on the declared field order.
+    return dump_json(_to_row(instance.model_dump(mode="json"), type(instance)))
+
+
+def decode_model(model: Type[ModelT], blob: bytes) -> ModelT:
+    return model.model_validate(_from_row(load_json(blob), model))
+
+
+def decode_model_or_none(
+    model: Type[ModelT], blob: Optional[bytes]
+) -> Optional[ModelT]:
+    if blob is None:
+        return None
+    try:
+        return decode_model(model, blob)
+    except (ValueError, TypeError, IndexError, zlib.error):
+        return None
+
+
+def _nested_model(model: Type[BaseModel], name: str) -> Optional[Type[BaseModel]]:
+    annotation = model.model_fields[name].annotation
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    if get_origin(annotation) in (Union, types.UnionType):
+        for arg in get_args(annotation):
+            if isinstance(arg, type) and issubclass(arg, BaseModel):
+                return arg
+    return None
+
+
+def _field_paths(model: Type[BaseModel]) -> list[str]:
+    paths = []
+    for name in model.model_fields:
+        paths.append(name)
+        nested = _nested_model(model, name)
+        if nested is not None:
+            paths.extend(f"{name}.{sub}" for sub in _field_paths(nested))
+    return paths
+
+
+def _to_row(data: Optional[dict], model: Type[BaseModel]) -> Optional[list]:
+    if data is None:
+        return None
+    row = []
+    for name in model.model_fields:
+        value = data.get(name)
+        nested = _nested_model(model, name)
+        row.append(_to_row(value, nested) if nested is not None else value)
+    return row
+
+
+def _from_row(row: Optional[list], model: Type[BaseModel]) -> Optional[dict]:
+    if row is None:
+        return None
+    data = {}
+    for name, value in zip(model.model_fields, row, strict=True):
+        nested = _nested_model(model, name)
+        data[name] = _from_row(value, nested) if nested is not None else value
+    return data
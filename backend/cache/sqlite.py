@@ -0,0 +1,158 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from cache.base import CacheBackend
+
+# Reads only bump the LRU clock when the entry hasn't been touched recently,
+# so hot keys don't turn every read into a write.
+ACCESS_RESOLUTION = 30.0
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache shared by every uvicorn worker on the host through a single SQLite
+    file in WAL mode. Blocking sqlite3 calls run in a worker thread.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Set up by one worker at a time, so the byte total is seeded once
+        self._conn.execute("BEGIN IMMEDIATE")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)"
+        )
+        # Running total of entries.size, kept in the file so every worker's
+        # writes count; eviction reads it instead of summing the table
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS totals (
+                id INTEGER PRIMARY KEY CHECK (id = 0),
+                size INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "INSERT OR IGNORE INTO totals (id, size) "
+            "SELECT 0, COALESCE(SUM(size), 0) FROM entries"
+        )
+        for name, event, change in (
+            ("entries_insert", "INSERT", "NEW.size"),
+            ("entries_update", "UPDATE OF size", "NEW.size - OLD.size"),
+            ("entries_delete", "DELETE", "-OLD.size"),
+        ):
+            self._conn.execute(
+                f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON entries "
+                f"BEGIN UPDATE totals SET size = size + {change} WHERE id = 0; END"
+            )
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await asyncio.to_thread(self._set_many, {key: value}, ttl)
+
+    async def set_many(self, items: dict[str, bytes], ttl: int) -> None:
+        if items:
+            await asyncio.to_thread(self._set_many, items, ttl)
+
+    async def delete(self, key: str) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM entries WHERE key = ?", key)
+
+    async def clear(self) -> None:
+        await asyncio.to_thread(self._execute, "DELETE FROM entries")
+
+    async def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            value, expires_at = row
+            if expires_at < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+            cursor = self._conn.execute(
+                "UPDATE entries SET accessed_at = ? WHERE key = ? AND accessed_at < ?",
+                (now, key, now - ACCESS_RESOLUTION),
+            )
+            if cursor.rowcount:
+                self._conn.commit()
+            return value
+
+    def _set_many(self, items: dict[str, bytes], ttl: int) -> None:
+        now = time.time()
+        rows = [
+            (key, value, len(key) + len(value), now + ttl, now)
+            for key, value in items.items()
+            if len(key) + len(value) <= self.max_bytes
+        ]
+        with self._lock:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete
+            # wouldn't fire the trigger that keeps the byte total
+            self._conn.executemany(
+                "INSERT INTO entries "
+                "(key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+                "size = excluded.size, expires_at = excluded.expires_at, "
+                "accessed_at = excluded.accessed_at",
+                rows,
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _total(self) -> int:
+        (total,) = self._conn.execute("SELECT size FROM totals WHERE id = 0").fetchone()
+        return total
+
+    def _evict(self, now: float) -> None:
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (now,))
+        total = self._total()
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until the file is back under budget
+        excess = total - self.max_bytes
+        freed = 0
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at"
+        ):
+            doomed.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", doomed)
+
+    def _execute(self, sql: str, *params) -> None:
+        with self._lock:
+            self._conn.execute(sql, params)
+            self._conn.commit()
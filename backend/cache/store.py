@@ -0,0 +1,14 @@
+from cache.base import CacheBackend
+from cache.memory import MemoryCache
+from config import settings
+
+
+def create_cache() -> CacheBackend:
+    if settings.CACHE_BACKEND == "sqlite":
+        from cache.sqlite import SQLiteCache
+
+        return SQLiteCache(settings.CACHE_SQLITE_PATH, settings.CACHE_MAX_BYTES)
+    return MemoryCache(settings.CACHE_MAX_BYTES)
+
+
+cache = create_cache()
@@ -19,10 +19,96 @@ class Settings(BaseSettings):
     FRONTEND_URL: str = "http://localhost:3000"
     GITHUB_API_BASE_URL: str = "https://api.github.com"
     DEFAULT_MERGE_METHOD: str = "squash"
+    PERMISSION_CACHE_TTL: int = 5 * 60  # 5 minutes
+    USER_CACHE_TTL: int = 60 * 60  # 1 hour
+    PR_CACHE_TTL: int = 10 * 60  # 10 minutes
+    GITHUB_MAX_CONNECTIONS: int = 100
+    # Seconds one attempt at a GitHub call may take, and the whole call
+    # including retries; only GETs are retried, with jittered exponential
+    # backoff starting at the base delay
+    GITHUB_TIMEOUT: float = 10.0
+    GITHUB_DEADLINE: float = 25.0
+    GITHUB_MAX_RETRIES: int = 2
+    GITHUB_RETRY_BASE_DELAY: float = 0.5
+    # Consecutive transient failures after which a token stops calling
+    # GitHub, and for how many seconds
+    GITHUB_BREAKER_THRESHOLD: int = 5
+    GITHUB_BREAKER_COOLDOWN: float = 30.0
+    # A GET still unanswered after its endpoint's recent p95 latency is
+    # sent a second time and the first answer wins; hedges are capped at
+    # this share of all GETs
+    GITHUB_HEDGE_ENABLED: bool = True
+    GITHUB_HEDGE_QUANTILE: float = 0.95
+    GITHUB_HEDGE_MAX_RATE: float = 0.03
+    GITHUB_HEDGE_WINDOW: int = 200
+    GITHUB_HEDGE_MIN_SAMPLES: int = 20
+    # Adaptive per-token concurrency (AIMD): the starting and allowed range
+    # of requests in flight, the cut on secondary rate limits or latency
+    # spikes, and what counts as a spike (after a few samples per endpoint)
+    GITHUB_AIMD_INITIAL: int = 16
+    GITHUB_AIMD_MIN: int = 1
+    GITHUB_AIMD_MAX: int = 64
+    GITHUB_AIMD_BACKOFF: float = 0.5
+    GITHUB_AIMD_SPIKE_FACTOR: float = 3.0
+    GITHUB_AIMD_WARMUP: int = 10
+    # Unchanged repos are re-validated with a conditional request at most
+    # this often
+    REFRESH_MAX_STALENESS: int = 5 * 60  # 5 minutes
+    # Rendered responses and PR snapshots younger than this are served
+    # (or answered with 304) without recomputing them; the scheduler's
+    # refresh interval for active users is derived from it
+    RESPONSE_MAX_AGE: int = 60
+    SESSION_REGISTRY_SIZE: int = 1000
+    # Most cards a single POST /api/prs/details call will enrich
+    DETAILS_MAX_BATCH: int = 20
+    # Card pipeline: items buffered between two stages, and how many items
+    # each network-bound stage works on at once
+    PIPELINE_QUEUE_SIZE: int = 100
+    PIPELINE_CONCURRENCY: int = 8
+    # Most cards scored in one batch, and how many top-ranked cards lead a
+    # queue requested with order=score or order=age
+    SCORE_BATCH_SIZE: int = 64
+    RANKED_PAGE_SIZE: int = 20
+    # Admission control for full card loads (/api/prs/all and single-repo
+    # listings): how many run at once on this instance, how many more may
+    # wait for a slot, and the Retry-After sent once that queue is full too
+    CARD_LOAD_CONCURRENCY: int = 16
+    CARD_LOAD_QUEUE: int = 64
+    CARD_LOAD_RETRY_AFTER: int = 5
+    # Queues (field set and ordering) a session keeps a snapshot of; the
+    # least recently used one is dropped past this
+    SESSION_MAX_QUEUES: int = 3
+    # Background login warm-ups (repo discovery plus the first page of
+    # cards) running at once on this instance; later logins wait their turn
+    WARMUP_CONCURRENCY: int = 4
+    # Background refresh of active users' queues: how often the scheduler
+    # wakes up, the longest refresh interval (someone active right now gets
+    # scheduler_min_interval, growing with idle time), when to stop
+    # refreshing an idle user altogether, the rate-limit calls always left
+    # for their requests, and how many of their most recently used queues
+    # are refreshed
+    SCHEDULER_TICK: int = 10
+    SCHEDULER_MAX_INTERVAL: int = 15 * 60  # 15 minutes
+    SCHEDULER_IDLE_CUTOFF: int = 60 * 60  # 1 hour
+    SCHEDULER_RATE_LIMIT_FLOOR: int = 1000
+    SCHEDULER_MAX_QUEUES: int = 2
+
+    # "memory" keeps a per-process LRU; "sqlite" shares one WAL file between
+    # all uvicorn workers on the host
+    CACHE_BACKEND: str = "memory"
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_SQLITE_PATH: str = "/tmp/prswipe-cache.sqlite3"
 
     @property
     def cors_origins(self) -> list[str]:
         return [origin.strip() for origin in self.ALLOWED_ORIGINS.split(",")]
 
+    @property
+    def scheduler_min_interval(self) -> float:
+        # Short enough that an active user's snapshot is rebuilt before it
+        # goes stale, even with the interval's +10% jitter and a tick that
+        # wakes up 20% late
+        return (self.RESPONSE_MAX_AGE - 1.2 * self.SCHEDULER_TICK) / 1.1
+
 
 settings = Settings()
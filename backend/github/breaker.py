@@ -0,0 +1,42 @@
+import time
+from typing import Optional
+
+from config import settings
+
+
+class CircuitBreaker:
+    """
+    Stops calling GitHub for `cooldown` seconds after `threshold` transient
+    failures in a row (5xx, timeouts, secondary rate limits), so callers
+    fail fast instead of queueing up behind a degraded API. Once the
+    cooldown is over calls go through again, but the first failure reopens
+    the circuit until a call succeeds.
+    """
+
+    __slots__ = ("threshold", "cooldown", "failures", "opened_at")
+
+    def __init__(
+        self,
+        threshold: int = settings.GITHUB_BREAKER_THRESHOLD,
+        cooldown: float = settings.GITHUB_BREAKER_COOLDOWN,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def retry_after(self) -> Optional[float]:
+        # Seconds until calls may go through again; None if they may now
+        if self.opened_at is None:
+            return None
+        remaining = self.opened_at + self.cooldown - time.monotonic()
+        return remaining if remaining > 0 else None
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
@@ -1,14 +1,171 @@
 import asyncio
-from typing import Optional
+import hashlib
+import random
+import time
+from typing import AsyncIterator, Optional
 
 import httpx
 
+from cache.base import CacheBackend
+from cache.codec import dump_json, load_json
+from cache.store import cache as default_cache
 from config import settings
+from github.breaker import CircuitBreaker
+from github.hedging import endpoint_key, hedged_send
+from github.limiter import AdaptiveLimiter
+from github.metrics import github_metrics
+from github.records import PullRequestCounts, PullRequestRecord
+
+# Only the profile fields PR cards render are kept in the shared cache
+USER_FIELDS = (
+    "login",
+    "avatar_url",
+    "html_url",
+    "name",
+    "bio",
+    "public_repos",
+    "followers",
+)
+
+# GitHub serves at most this many results for any one search query
+SEARCH_RESULT_LIMIT = 1000
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    # One pooled transport for every GitHubClient so connections (and TLS
+    # sessions) to api.github.com are reused across requests and users
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.GITHUB_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.GITHUB_MAX_CONNECTIONS,
+            ),
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class GitHubAPIError(Exception):
+    def __init__(
+        self, message: str, status_code: int, retry_after: Optional[float] = None
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class NotFound(GitHubAPIError):
+    pass
+
+
+class Conflict(GitHubAPIError):
+    pass
+
+
+class Unauthorized(GitHubAPIError):
+    # The user's token was rejected (revoked or expired)
+    pass
+
+
+class Forbidden(GitHubAPIError):
+    # 403s that aren't rate limits: no access, or the action isn't allowed
+    pass
+
+
+class Unprocessable(GitHubAPIError):
+    # 422: GitHub refused the request as given, e.g. a merge it won't do
+    pass
+
+
+class RateLimited(GitHubAPIError):
+    # GitHub answers 403 or 429; it is always surfaced as 429 so it is never
+    # mistaken for a permission denial
+    def __init__(
+        self, message: str, retry_after: Optional[float] = None, secondary: bool = False
+    ):
+        super().__init__(message, 429, retry_after)
+        self.secondary = secondary
+
+
+class GitHubUnavailable(GitHubAPIError):
+    # 5xx answers, timeouts, unreachable hosts and an open circuit breaker
+    pass
+
+
+def is_secondary_limit(response: httpx.Response, message: Optional[str] = None) -> bool:
+    # GitHub's abuse throttling: 403/429 with Retry-After or saying so
+    if response.status_code not in (403, 429):
+        return False
+    if "Retry-After" in response.headers:
+        return True
+    text = (message if message is not None else response.text).lower()
+    return "secondary rate limit" in text or "abuse" in text
+
+
+def error_from_response(response: httpx.Response) -> GitHubAPIError:
+    try:
+        error_data = response.json() if response.content else {}
+    except ValueError:
+        error_data = {}
+    status = response.status_code
+    message = error_data.get("message", f"GitHub API error: {status}")
+    retry_after = response.headers.get("Retry-After")
+    retry_after = float(retry_after) if retry_after and retry_after.isdigit() else None
+
+    if status in (403, 429):
+        if is_secondary_limit(response, message):
+            return RateLimited(message, retry_after, secondary=True)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = response.headers.get("X-RateLimit-Reset", "")
+            wait = int(reset) - time.time() if reset.isdigit() else None
+            return RateLimited(message, max(wait, 0) if wait is not None else None)
+    if status == 401:
+        return Unauthorized(message, status)
+    if status == 403:
+        return Forbidden(message, status)
+    if status in (404, 410):
+        return NotFound(message, status)
+    if status == 409:
+        return Conflict(message, status)
+    if status == 422:
+        return Unprocessable(message, status)
+    if status >= 500:
+        return GitHubUnavailable(message, status, retry_after)
+    return GitHubAPIError(message, status, retry_after)
+
+
+def is_transient(error: GitHubAPIError) -> bool:
+    return isinstance(error, GitHubUnavailable) or (
+        isinstance(error, RateLimited) and error.secondary
+    )
+
+
+def backoff_delay(attempt: int) -> float:
+    # Full jitter, so retries from parallel fan-out don't arrive together
+    return random.uniform(0, settings.GITHUB_RETRY_BASE_DELAY * 2**attempt)
 
 
 class GitHubClient:
-    def __init__(self, token: str):
+    def __init__(self, token: str, cache: Optional[CacheBackend] = None):
         self.token = token
+        self.cache = cache or default_cache
+        self.identity = hashlib.sha256(token.encode()).hexdigest()
+        self.rate_limit_remaining: Optional[int] = None
+        self.rate_limit_reset: Optional[int] = None
+        # A client is one token against one API host, so this is the
+        # per-host, per-token breaker (and concurrency limit)
+        self.breaker = CircuitBreaker()
+        self.limiter = AdaptiveLimiter()
         self.api_base_url = settings.GITHUB_API_BASE_URL
         self.headers = {
             "Authorization": f"Bearer {token}",
@@ -16,53 +173,158 @@ class GitHubClient:
             "X-GitHub-Api-Version": "2022-11-28",
         }
 
-    async def _request(self, method: str, endpoint: str, **kwargs) -> dict:
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        headers: Optional[dict] = None,
+        deadline: float = settings.GITHUB_DEADLINE,
+        urgent: bool = False,
+        **kwargs,
+    ) -> httpx.Response:
         url = f"{self.api_base_url}{endpoint}"
-        async with httpx.AsyncClient() as client:
-            response = await client.request(
-                method=method,
-                url=url,
-                headers=self.headers,
-                **kwargs,
-            )
-            if response.status_code == 204:
-                return {}
-            if response.status_code >= 400:
-                error_data = response.json() if response.content else {}
-                raise Exception(
-                    error_data.get(
-                        "message", f"GitHub API error: {response.status_code}"
-                    )
+        give_up_at = time.monotonic() + deadline
+        # Only reads are retried; a retried merge or comment could apply twice
+        attempts = settings.GITHUB_MAX_RETRIES + 1 if method == "GET" else 1
+        # Writes, and the reads a merge or close makes first, go ahead of
+        # queued card loads on this token
+        urgent = urgent or method != "GET"
+        attempt = 0
+        while True:
+            wait = self.breaker.retry_after()
+            if wait is not None:
+                raise GitHubUnavailable(
+                    "GitHub is failing for this account; try again shortly",
+                    503,
+                    wait,
                 )
-            return response.json()
+            timeout = min(settings.GITHUB_TIMEOUT, give_up_at - time.monotonic())
+
+            async def send(on_wire=None) -> httpx.Response:
+                await self.limiter.acquire(urgent=urgent)
+                if on_wire is not None:
+                    on_wire()
+                github_metrics.requests += 1
+                start = time.monotonic()
+                seconds, overloaded = None, False
+                try:
+                    response = await get_http_client().request(
+                        method=method,
+                        url=url,
+                        headers=(
+                            {**self.headers, **headers} if headers else self.headers
+                        ),
+                        timeout=max(timeout, 0.1),
+                        **kwargs,
+                    )
+                    overloaded = is_secondary_limit(response)
+                    if not overloaded:
+                        seconds = time.monotonic() - start
+                    return response
+                except httpx.TimeoutException:
+                    overloaded = True
+                    raise
+                finally:
+                    self.limiter.release(key, seconds, overloaded)
+
+            key = endpoint_key(endpoint)
+            try:
+                if method == "GET" and settings.GITHUB_HEDGE_ENABLED:
+                    response = await hedged_send(key, send, self.limiter.has_room)
+                else:
+                    response = await send()
+            except httpx.TimeoutException:
+                error = GitHubUnavailable("GitHub did not answer in time", 504)
+            except httpx.TransportError as e:
+                error = GitHubUnavailable(f"Could not reach GitHub: {e}", 503)
+            else:
+                self._track_rate_limit(response)
+                if response.status_code < 400:
+                    self.breaker.record_success()
+                    return response
+                error = error_from_response(response)
+
+            if not is_transient(error):
+                # GitHub answered, it just said no
+                self.breaker.record_success()
+                raise error
+            self.breaker.record_failure()
+            delay = error.retry_after or backoff_delay(attempt)
+            if attempt + 1 == attempts or time.monotonic() + delay >= give_up_at:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+            github_metrics.retries += 1
+
+    async def _request(self, method: str, endpoint: str, **kwargs) -> dict:
+        response = await self._send(method, endpoint, **kwargs)
+        if response.status_code == 204:
+            return {}
+        return response.json()
+
+    async def _paginate(
+        self, endpoint: str, params: Optional[dict] = None
+    ) -> AsyncIterator[list]:
+        # Yields one page at a time so callers can reduce each page before
+        # the next one is fetched
+        params = {"per_page": 100, **(params or {})}
+        while True:
+            data = await self._request("GET", endpoint, params=params)
+            yield data
+            if len(data) < params["per_page"]:
+                break
+            params["page"] = params.get("page", 1) + 1
+
+    def _track_rate_limit(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.rate_limit_reset = int(reset)
 
     async def get_authenticated_user(self) -> dict:
         return await self._request("GET", "/user")
 
     async def get_user(self, username: str) -> dict:
-        return await self._request("GET", f"/users/{username}")
+        # Public profiles are the same for every viewer, so they are cached
+        # once for all sessions
+        key = f"gh:user:{username.lower()}"
+        cached = await self.cache.get(key)
+        if cached is not None:
+            return load_json(cached)
+        data = await self._request("GET", f"/users/{username}")
+        user = {field: data.get(field) for field in USER_FIELDS}
+        await self.cache.set(key, dump_json(user), settings.USER_CACHE_TTL)
+        return user
 
-    async def list_repos(
+    async def iter_repos(
         self,
         page: int = 1,
-        per_page: int = 30,
+        per_page: int = 100,
         sort: str = "updated",
         affiliation: str = "owner,collaborator,organization_member",
-    ) -> list[dict]:
-        repos = []
+    ) -> AsyncIterator[dict]:
         params = {
             "page": page,
             "per_page": min(per_page, 100),
             "sort": sort,
             "affiliation": affiliation,
         }
-        while True:
-            data = await self._request("GET", "/user/repos", params=params)
-            repos.extend(data)
-            if len(data) < params["per_page"]:
-                break
-            params["page"] += 1
-        return repos
+        async for data in self._paginate("/user/repos", params):
+            for repo in data:
+                yield repo
+
+    async def list_repos(
+        self,
+        page: int = 1,
+        per_page: int = 30,
+        sort: str = "updated",
+        affiliation: str = "owner,collaborator,organization_member",
+    ) -> list[dict]:
+        return [
+            repo async for repo in self.iter_repos(page, per_page, sort, affiliation)
+        ]
 
     async def search_repos(self, query: str) -> list[dict]:
         data = await self._request("GET", "/user/repos", params={"per_page": 100})
@@ -71,8 +333,49 @@ class GitHubClient:
             repo for repo in data if query_lower in repo.get("full_name", "").lower()
         ]
 
-    async def get_repo(self, owner: str, repo: str) -> dict:
-        return await self._request("GET", f"/repos/{owner}/{repo}")
+    async def iter_search_pages(
+        self, query: str, per_page: int = 100
+    ) -> AsyncIterator[dict]:
+        # Whole result pages, so callers can see total_count and
+        # incomplete_results; the search API never returns more than
+        # SEARCH_RESULT_LIMIT results per query
+        params = {"q": query, "per_page": min(per_page, 100), "page": 1}
+        seen = 0
+        while True:
+            data = await self._request("GET", "/search/issues", params=params)
+            yield data
+            page_items = data.get("items", [])
+            seen += len(page_items)
+            if len(page_items) < params["per_page"] or seen >= min(
+                data.get("total_count", 0), SEARCH_RESULT_LIMIT
+            ):
+                break
+            params["page"] += 1
+
+    async def iter_search_issues(
+        self, query: str, per_page: int = 100
+    ) -> AsyncIterator[dict]:
+        async for data in self.iter_search_pages(query, per_page):
+            for item in data.get("items", []):
+                yield item
+
+    async def count_search_issues(self, query: str) -> int:
+        # total_count alone, without paging through the results
+        data = await self._request(
+            "GET", "/search/issues", params={"q": query, "per_page": 1}
+        )
+        return data.get("total_count", 0)
+
+    async def search_issues(self, query: str, max_results: int = 1000) -> list[dict]:
+        items = []
+        async for item in self.iter_search_issues(query):
+            items.append(item)
+            if len(items) >= max_results:
+                break
+        return items
+
+    async def get_repo(self, owner: str, repo: str, urgent: bool = False) -> dict:
+        return await self._request("GET", f"/repos/{owner}/{repo}", urgent=urgent)
 
     async def get_open_prs_count(self, owner: str, repo: str) -> int:
         data = await self._request(
@@ -82,18 +385,45 @@ class GitHubClient:
         )
         return len(data)
 
-    async def list_open_prs(self, owner: str, repo: str) -> list[dict]:
-        prs = []
+    async def iter_open_prs(
+        self, owner: str, repo: str, per_page: int = 100
+    ) -> AsyncIterator[PullRequestRecord]:
+        params = {"state": "open", "per_page": min(per_page, 100)}
+        async for data in self._paginate(f"/repos/{owner}/{repo}/pulls", params):
+            for pr in data:
+                yield PullRequestRecord(pr, detailed=False)
+
+    async def list_open_prs(self, owner: str, repo: str) -> list[PullRequestRecord]:
+        return [pr async for pr in self.iter_open_prs(owner, repo)]
+
+    async def list_open_prs_if_changed(
+        self, owner: str, repo: str, etag: Optional[str] = None
+    ) -> tuple[Optional[list[PullRequestRecord]], Optional[str]]:
+        """
+        Lists open PRs with If-None-Match on the first page. Returns
+        (None, etag) when GitHub answers 304 — those responses don't count
+        against the rate limit — otherwise the full listing (as records,
+        parsed page by page) and its new ETag.
+        """
+        endpoint = f"/repos/{owner}/{repo}/pulls"
         params = {"state": "open", "per_page": 100}
-        while True:
-            data = await self._request(
-                "GET", f"/repos/{owner}/{repo}/pulls", params=params
-            )
-            prs.extend(data)
-            if len(data) < params["per_page"]:
-                break
+        response = await self._send(
+            "GET",
+            endpoint,
+            headers={"If-None-Match": etag} if etag else None,
+            params=params,
+        )
+        if response.status_code == 304:
+            return None, etag
+
+        new_etag = response.headers.get("ETag")
+        data = response.json()
+        prs = [PullRequestRecord(pr, detailed=False) for pr in data]
+        while len(data) == params["per_page"]:
             params["page"] = params.get("page", 1) + 1
-        return prs
+            data = await self._request("GET", endpoint, params=params)
+            prs.extend(PullRequestRecord(pr, detailed=False) for pr in data)
+        return prs, new_etag
 
     async def list_open_prs_with_details(self, owner: str, repo: str) -> list[dict]:
         """
@@ -105,52 +435,96 @@ class GitHubClient:
         if not prs:
             return []
         detailed_prs = await asyncio.gather(
-            *[self.get_pull_request(owner, repo, pr["number"]) for pr in prs]
+            *[self.get_pull_request(owner, repo, pr.number) for pr in prs]
         )
         return list(detailed_prs)
 
-    async def get_pull_request(self, owner: str, repo: str, pull_number: int) -> dict:
-        pr = await self._request("GET", f"/repos/{owner}/{repo}/pulls/{pull_number}")
-        if pr.get("mergeable") is False or pr.get("mergeable") is None:
+    async def get_pull_request(
+        self,
+        owner: str,
+        repo: str,
+        pull_number: int,
+        wait_for_mergeable: bool = True,
+        urgent: bool = False,
+    ) -> dict:
+        endpoint = f"/repos/{owner}/{repo}/pulls/{pull_number}"
+        pr = await self._request("GET", endpoint, urgent=urgent)
+        if wait_for_mergeable and not pr.get("mergeable"):
             await asyncio.sleep(1)
-            pr = await self._request(
-                "GET", f"/repos/{owner}/{repo}/pulls/{pull_number}"
-            )
+            pr = await self._request("GET", endpoint, urgent=urgent)
         return pr
 
+    async def get_pull_request_record(
+        self, owner: str, repo: str, pull_number: int, wait_for_mergeable: bool = True
+    ) -> PullRequestRecord:
+        return PullRequestRecord(
+            await self.get_pull_request(owner, repo, pull_number, wait_for_mergeable)
+        )
+
+    async def count_pull_request_activity(
+        self, owner: str, repo: str, pull_number: int
+    ) -> PullRequestCounts:
+        counts = PullRequestCounts()
+
+        async def count_files():
+            async for f in self.iter_pr_files(owner, repo, pull_number):
+                counts.changed_files += 1
+                counts.additions += f.get("additions", 0)
+                counts.deletions += f.get("deletions", 0)
+
+        async def count_commits():
+            async for _ in self.iter_pr_commits(owner, repo, pull_number):
+                counts.commits += 1
+
+        async def count_reviews():
+            async for _ in self.iter_pr_reviews(owner, repo, pull_number):
+                counts.reviews += 1
+
+        async def count_comments():
+            comments = await self.get_pull_request_comments(owner, repo, pull_number)
+            counts.comments = len(comments) if isinstance(comments, list) else 0
+
+        await asyncio.gather(
+            count_files(), count_commits(), count_reviews(), count_comments()
+        )
+        return counts
+
+    async def iter_pr_files(
+        self, owner: str, repo: str, pull_number: int
+    ) -> AsyncIterator[dict]:
+        async for data in self._paginate(
+            f"/repos/{owner}/{repo}/pulls/{pull_number}/files"
+        ):
+            for f in data:
+                yield f
+
+    async def iter_pr_commits(
+        self, owner: str, repo: str, pull_number: int
+    ) -> AsyncIterator[dict]:
+        async for data in self._paginate(
+            f"/repos/{owner}/{repo}/pulls/{pull_number}/commits"
+        ):
+            for commit in data:
+                yield commit
+
+    async def iter_pr_reviews(
+        self, owner: str, repo: str, pull_number: int
+    ) -> AsyncIterator[dict]:
+        async for data in self._paginate(
+            f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews"
+        ):
+            for review in data:
+                yield review
+
     async def get_pull_request_files(
         self, owner: str, repo: str, pull_number: int
     ) -> list[dict]:
-        files = []
-        params = {"per_page": 100}
-        while True:
-            data = await self._request(
-                "GET",
-                f"/repos/{owner}/{repo}/pulls/{pull_number}/files",
-                params=params,
-            )
-            files.extend(data)
-            if len(data) < params["per_page"]:
-                break
-            params["page"] = params.get("page", 1) + 1
-        return files
+        return [f async for f in self.iter_pr_files(owner, repo, pull_number)]
 
     async def get_pull_request_commits(
         self, owner: str, repo: str, pull_number: int
     ) -> list[dict]:
-        commits = []
-        params = {"per_page": 100}
-        while True:
-            data = await self._request(
-                "GET",
-                f"/repos/{owner}/{repo}/pulls/{pull_number}/commits",
-                params=params,
-            )
-            commits.extend(data)
-            if len(data) < params["per_page"]:
-                break
-            params["page"] = params.get("page", 1) + 1
-        return commits
+        return [c async for c in self.iter_pr_commits(owner, repo, pull_number)]
 
     async def get_pull_request_comments(
         self, owner: str, repo: str, pull_number: int
@@ -165,19 +539,7 @@ class GitHubClient:
     async def get_pull_request_reviews(
         self, owner: str, repo: str, pull_number: int
     ) -> list[dict]:
-        reviews = []
-        params = {"per_page": 100}
-        while True:
-            data = await self._request(
-                "GET",
-                f"/repos/{owner}/{repo}/pulls/{pull_number}/reviews",
-                params=params,
-            )
-            reviews.extend(data)
-            if len(data) < params["per_page"]:
-                break
-            params["page"] = params.get("page", 1) + 1
-        return reviews
+        return [r async for r in self.iter_pr_reviews(owner, repo, pull_number)]
 
     async def merge_pull_request(
         self,
@@ -187,12 +549,16 @@ class GitHubClient:
         merge_method: str = "squash",
         commit_title: Optional[str] = None,
         commit_message: Optional[str] = None,
+        sha: Optional[str] = None,
     ) -> dict:
         body = {"merge_method": merge_method}
         if commit_title:
             body["commit_title"] = commit_title
         if commit_message:
             body["commit_message"] = commit_message
+        if sha:
+            # GitHub rejects the merge with 409 if the head has moved on
+            body["sha"] = sha
         return await self._request(
             "PUT",
             f"/repos/{owner}/{repo}/pulls/{pull_number}/merge",
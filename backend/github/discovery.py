@@ -0,0 +1,133 @@
+from typing import Optional
+
+from github.client import SEARCH_RESULT_LIMIT, GitHubClient
+
+# GitHub rejects search queries longer than 256 characters
+MAX_QUERY_LENGTH = 256
+BASE_QUERY = "is:pr is:open archived:false"
+
+
+def owner_qualifier(repo: dict) -> str:
+    owner = repo.get("owner") or {}
+    prefix = "org" if owner.get("type") == "Organization" else "user"
+    return f"{prefix}:{owner.get('login', '')}"
+
+
+def build_search_queries(qualifiers: list[str]) -> list[str]:
+    queries = []
+    current = BASE_QUERY
+    for qualifier in sorted(set(qualifiers)):
+        candidate = f"{current} {qualifier}"
+        if len(candidate) > MAX_QUERY_LENGTH and current != BASE_QUERY:
+            queries.append(current)
+            candidate = f"{BASE_QUERY} {qualifier}"
+        current = candidate
+    if current != BASE_QUERY:
+        queries.append(current)
+    return queries
+
+
+def owner_queries(push_repos: list[dict]) -> list[str]:
+    # Searches covering every owner of these repos, usually just one
+    return build_search_queries([owner_qualifier(repo) for repo in push_repos])
+
+
+def repo_queries(repos: list[dict]) -> list[str]:
+    # Searches covering exactly these repos, split at the length limit
+    return build_search_queries([f"repo:{repo['full_name']}" for repo in repos])
+
+
+def repo_from_search_item(item: dict) -> str:
+    # repository_url looks like https://api.github.com/repos/{owner}/{name}
+    return "/".join(item.get("repository_url", "").split("/")[-2:])
+
+
+def query_qualifiers(query: str) -> set[str]:
+    return set(query.split()[len(BASE_QUERY.split()) :])
+
+
+async def search_repos(client: GitHubClient, query: str) -> tuple[set[str], bool]:
+    """
+    Repos with open PRs matching query, and whether the search saw all of
+    them. Past SEARCH_RESULT_LIMIT results (or when GitHub flags the
+    results incomplete) repos beyond the last page would go missing.
+    """
+    found = set()
+    async for data in client.iter_search_pages(query):
+        found.update(
+            repo_from_search_item(item).lower() for item in data.get("items", [])
+        )
+        if (
+            data.get("incomplete_results")
+            or data.get("total_count", 0) > SEARCH_RESULT_LIMIT
+        ):
+            return found, False
+    return found, True
+
+
+def split_query(query: str, repos: list[dict]) -> list[str]:
+    # An owner query is narrowed to batches of its repos; a batch of repos
+    # to one query per repo
+    qualifiers = query_qualifiers(query)
+    if any(not qualifier.startswith("repo:") for qualifier in qualifiers):
+        return repo_queries(repos)
+    return [f"{BASE_QUERY} repo:{repo['full_name']}" for repo in repos]
+
+
+def covered_repos(query: str, push_repos: list[dict]) -> list[dict]:
+    qualifiers = query_qualifiers(query)
+    return [
+        repo
+        for repo in push_repos
+        if owner_qualifier(repo) in qualifiers
+        or f"repo:{repo['full_name']}" in qualifiers
+    ]
+
+
+async def discover_repos_with_open_prs(
+    client: GitHubClient, push_repos: list[dict]
+) -> Optional[list[dict]]:
+    """
+    Narrows push_repos down to the ones that currently have open PRs using a
+    few search/issues queries (one per batch of owners) instead of listing
+    pulls on every repo. A query whose results are truncated is split into
+    narrower ones for the repos it hasn't found yet. Returns None if search
+    is unavailable so callers can fall back to iterating every repo.
+    """
+    if not push_repos:
+        return []
+
+    by_name = {repo["full_name"].lower(): repo for repo in push_repos}
+    queries = owner_queries(push_repos)
+
+    found = set()
+    try:
+        while queries:
+            query = queries.pop()
+            repos = [
+                repo
+                for repo in covered_repos(query, push_repos)
+                if repo["full_name"].lower() not in found
+            ]
+            if not repos:
+                continue
+            if query_qualifiers(query) == {f"repo:{repos[0]['full_name']}"}:
+                # Only whether the repo has any open PR matters, which the
+                # count answers without paging
+                if await client.count_search_issues(query):
+                    found.add(repos[0]["full_name"].lower())
+                continue
+            hits, complete = await search_repos(client, query)
+            found |= hits
+            if not complete:
+                queries.extend(
+                    split_query(
+                        query,
+                        [r for r in repos if r["full_name"].lower() not in found],
+                    )
+                )
+    except Exception as e:
+        print(f"[DEBUG] PR search failed, falling back to per-repo listing: {e}")
+        return None
+
+    return [repo for name, repo in by_name.items() if name in found]
@@ -0,0 +1,152 @@
+import asyncio
+import re
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from config import settings
+from github.metrics import github_metrics
+
+_NUMBER = re.compile(r"/\d+")
+_REPO = re.compile(r"^/repos/[^/]+/[^/]+")
+_USER = re.compile(r"^/users/[^/]+")
+
+
+def endpoint_key(endpoint: str) -> str:
+    # "/repos/acme/api/pulls/12/files" -> "/repos/:owner/:repo/pulls/:n/files"
+    key = _REPO.sub("/repos/:owner/:repo", endpoint)
+    key = _USER.sub("/users/:login", key)
+    return _NUMBER.sub("/:n", key)
+
+
+class LatencyTracker:
+    """
+    Recent latencies per endpoint, and the quantile past which a GET to
+    that endpoint is worth hedging. The quantile is recomputed every few
+    samples rather than on every call.
+    """
+
+    def __init__(
+        self,
+        window: int = settings.GITHUB_HEDGE_WINDOW,
+        quantile: float = settings.GITHUB_HEDGE_QUANTILE,
+        min_samples: int = settings.GITHUB_HEDGE_MIN_SAMPLES,
+    ):
+        self.window = window
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self._samples: dict[str, deque] = {}
+        self._thresholds: dict[str, float] = {}
+        # Samples ever recorded per key; the deque's length stops growing
+        # once it is full
+        self._recorded: dict[str, int] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        samples = self._samples.get(key)
+        if samples is None:
+            samples = self._samples[key] = deque(maxlen=self.window)
+        samples.append(seconds)
+        recorded = self._recorded[key] = self._recorded.get(key, 0) + 1
+        if len(samples) >= self.min_samples and recorded % 10 == 0:
+            ordered = sorted(samples)
+            index = min(int(len(ordered) * self.quantile), len(ordered) - 1)
+            self._thresholds[key] = ordered[index]
+
+    def threshold(self, key: str) -> Optional[float]:
+        return self._thresholds.get(key)
+
+    def thresholds(self) -> dict[str, float]:
+        return {key: round(value, 3) for key, value in self._thresholds.items()}
+
+
+class HedgeBudget:
+    """
+    Global cap on hedging: every GET earns `rate` of a hedge, and a hedge
+    spends a whole one, so duplicates never exceed that share of calls
+    (and of the rate limit they cost).
+    """
+
+    def __init__(self, rate: float = settings.GITHUB_HEDGE_MAX_RATE, burst: float = 10):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = 0.0
+
+    def earn(self) -> None:
+        self.tokens = min(self.tokens + self.rate, self.burst)
+
+    def take(self) -> bool:
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+latency_tracker = LatencyTracker()
+hedge_budget = HedgeBudget()
+
+
+async def hedged_send(
+    key: str,
+    send: Callable[[Callable[[], None]], Awaitable[httpx.Response]],
+    can_hedge: Callable[[], bool],
+) -> httpx.Response:
+    """
+    Sends a GET, and if it hasn't answered by the endpoint's tracked
+    latency quantile (and the budget allows), a duplicate. The first
+    successful response wins; the other request is cancelled.
+
+    send calls the callback it is given once the request has a limiter slot
+    and goes on the wire. Both the hedge delay and the latency samples
+    start there: time spent queued behind the token's other calls isn't
+    slowness a duplicate would fix. For the same reason a hedge is only
+    sent while can_hedge() says a slot is free.
+    """
+    hedge_budget.earn()
+    loop = asyncio.get_running_loop()
+    sent_at: list[float] = []
+    sent = asyncio.Event()
+
+    def on_wire() -> None:
+        if not sent_at:
+            sent_at.append(loop.time())
+            sent.set()
+
+    delay = latency_tracker.threshold(key)
+    if delay is None:
+        # Too few samples to know what slow is; no task needed
+        response = await send(on_wire)
+        latency_tracker.record(key, loop.time() - sent_at[0])
+        return response
+
+    primary = asyncio.ensure_future(send(on_wire))
+    tasks = {primary}
+    try:
+        waiter = asyncio.ensure_future(sent.wait())
+        try:
+            await asyncio.wait({primary, waiter}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        remaining = delay - (loop.time() - sent_at[0]) if sent_at else 0
+        done, _ = await asyncio.wait(tasks, timeout=max(remaining, 0))
+        if not done:
+            if can_hedge() and hedge_budget.take():
+                github_metrics.hedges += 1
+                tasks.add(asyncio.ensure_future(send(on_wire)))
+            else:
+                github_metrics.hedges_denied += 1
+
+        error: Optional[BaseException] = None
+        while tasks:
+            done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is not primary:
+                        github_metrics.hedge_wins += 1
+                    latency_tracker.record(key, loop.time() - sent_at[0])
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in tasks:
+            task.cancel()
@@ -0,0 +1,116 @@
+import asyncio
+import time
+import weakref
+from collections import deque
+from typing import Optional
+
+from config import settings
+
+# Every live limiter, for the /metrics summary
+limiters: "weakref.WeakSet[AdaptiveLimiter]" = weakref.WeakSet()
+
+
+class AdaptiveLimiter:
+    """
+    AIMD concurrency limit for one token's GitHub calls. While latency is
+    stable and the limit is actually being used, it grows by one request
+    per window of calls; a secondary-rate-limit answer, a timeout or a
+    latency spike cuts it by GITHUB_AIMD_BACKOFF. Cuts happen at most once
+    per baseline round trip, so one burst of failures halves it once.
+    """
+
+    def __init__(
+        self,
+        initial: int = settings.GITHUB_AIMD_INITIAL,
+        minimum: int = settings.GITHUB_AIMD_MIN,
+        maximum: int = settings.GITHUB_AIMD_MAX,
+    ):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.in_flight = 0
+        # Smoothed latency per endpoint, the baseline spikes are judged by
+        self._baselines: dict[str, float] = {}
+        self._samples: dict[str, int] = {}
+        self._last_cut = 0.0
+        self._waiters: deque[asyncio.Future] = deque()
+        limiters.add(self)
+
+    async def acquire(self, urgent: bool = False) -> None:
+        # Urgent callers queue at the front, so a user's merge isn't stuck
+        # behind a fan-out of card reads on the same token
+        while self.in_flight >= int(self.limit):
+            waiter = asyncio.get_running_loop().create_future()
+            if urgent:
+                self._waiters.appendleft(waiter)
+            else:
+                self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                elif not waiter.cancelled():
+                    # Woken but not going to use the slot; pass it on
+                    self._wake()
+                raise
+        self.in_flight += 1
+
+    def has_room(self) -> bool:
+        # A call made now would start right away rather than queue
+        return self.in_flight < int(self.limit) and not self._waiters
+
+    def release(self, key: str, seconds: Optional[float], overloaded: bool) -> None:
+        # Synchronous, so a cancelled request can't skip giving its slot back
+        saturated = self.in_flight >= int(self.limit)
+        self.in_flight -= 1
+        if overloaded or self._is_spike(key, seconds):
+            self._cut(key)
+        elif seconds is not None and saturated:
+            self.limit = min(self.limit + 1 / self.limit, self.maximum)
+        self._wake()
+
+    def _wake(self) -> None:
+        free = int(self.limit) - self.in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def _is_spike(self, key: str, seconds: Optional[float]) -> bool:
+        if seconds is None:
+            return False
+        baseline = self._baselines.get(key)
+        samples = self._samples.get(key, 0) + 1
+        self._samples[key] = samples
+        if baseline is None:
+            self._baselines[key] = seconds
+            return False
+        spike = (
+            samples > settings.GITHUB_AIMD_WARMUP
+            and seconds > baseline * settings.GITHUB_AIMD_SPIKE_FACTOR
+        )
+        if not spike:
+            self._baselines[key] = 0.9 * baseline + 0.1 * seconds
+        return spike
+
+    def _cut(self, key: str) -> None:
+        now = time.monotonic()
+        if now - self._last_cut < self._baselines.get(key, 1.0):
+            return
+        self._last_cut = now
+        self.limit = max(self.limit * settings.GITHUB_AIMD_BACKOFF, self.minimum)
+
+
+def limiter_metrics() -> dict:
+    current = [limiter.limit for limiter in list(limiters)]
+    if not current:
+        return {"tokens": 0}
+    return {
+        "tokens": len(current),
+        "min": round(min(current), 2),
+        "max": round(max(current), 2),
+        "mean": round(sum(current) / len(current), 2),
+        "in_flight": sum(limiter.in_flight for limiter in list(limiters)),
+    }
@@ -0,0 +1,23 @@
+class GitHubMetrics:
+    """
+    Process-wide counters for calls made to GitHub, served by /metrics.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.hedges_denied = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedges_denied": self.hedges_denied,
+        }
+
+
+github_metrics = GitHubMetrics()
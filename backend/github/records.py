@@ -0,0 +1,76 @@
+from typing import Optional
+
+
+class PullRequestRecord:
+    """
+    The parts of a GitHub pull request that PR cards are built from, parsed
+    once at the client boundary so nested head/base repos, _links and the
+    rest of the payload are never held onto. Listing items lack
+    mergeability, so records built from them are marked as not detailed.
+    """
+
+    __slots__ = (
+        "number",
+        "title",
+        "body",
+        "html_url",
+        "state",
+        "draft",
+        "mergeable",
+        "created_at",
+        "updated_at",
+        "author_login",
+        "head_ref",
+        "head_sha",
+        "base_ref",
+        "requested_reviewers",
+        "labels",
+        "detailed",
+    )
+
+    def __init__(self, data: dict, detailed: bool = True):
+        head = data.get("head") or {}
+        self.number: int = data["number"]
+        self.title: str = data.get("title", "")
+        self.body: Optional[str] = data.get("body")
+        self.html_url: str = data.get("html_url", "")
+        self.state: Optional[str] = data.get("state")
+        self.draft: bool = data.get("draft", False)
+        self.mergeable: Optional[bool] = data.get("mergeable")
+        self.created_at: str = data.get("created_at", "")
+        self.updated_at: str = data.get("updated_at", "")
+        self.author_login: str = (data.get("user") or {}).get("login", "")
+        self.head_ref: str = head.get("ref", "")
+        self.head_sha: str = head.get("sha", "")
+        self.base_ref: str = (data.get("base") or {}).get("ref", "")
+        self.requested_reviewers: tuple[str, ...] = tuple(
+            r.get("login", "") for r in data.get("requested_reviewers") or ()
+        )
+        self.labels: tuple[str, ...] = tuple(
+            label.get("name", "") for label in data.get("labels") or ()
+        )
+        self.detailed = detailed
+
+
+class PullRequestCounts:
+    """
+    Activity counters for one PR. The files/commits/reviews listings are
+    summed page by page as they stream in and never kept.
+    """
+
+    __slots__ = (
+        "additions",
+        "deletions",
+        "changed_files",
+        "commits",
+        "reviews",
+        "comments",
+    )
+
+    def __init__(self):
+        self.additions = 0
+        self.deletions = 0
+        self.changed_files = 0
+        self.commits = 0
+        self.reviews = 0
+        self.comments = 0
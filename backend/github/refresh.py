@@ -0,0 +1,222 @@
+import asyncio
+import time
+from typing import Optional
+
+from config import settings
+from github.client import GitHubClient
+from github.records import PullRequestRecord
+
+
+def repo_fingerprint(repo_data: dict) -> tuple:
+    # open_issues_count includes open PRs, so new PRs from forks change the
+    # fingerprint even though they don't touch pushed_at
+    return (
+        repo_data.get("pushed_at"),
+        repo_data.get("updated_at"),
+        repo_data.get("open_issues_count"),
+    )
+
+
+def details_current(pr: PullRequestRecord, pushed: bool) -> bool:
+    # GitHub answers mergeable: null while it is still working it out
+    return pr.detailed and pr.mergeable is not None and not pushed
+
+
+class RepoState:
+    __slots__ = ("fingerprint", "etag", "single_page", "prs", "checked_at")
+
+    def __init__(
+        self,
+        fingerprint: Optional[tuple],
+        etag: Optional[str],
+        single_page: bool,
+        prs: list[PullRequestRecord],
+    ):
+        self.fingerprint = fingerprint
+        self.etag = etag
+        self.single_page = single_page
+        self.prs = prs
+        self.checked_at = time.monotonic()
+
+
+class RefreshEngine:
+    """
+    Per-user memory of each repo's last known open PR set. A refresh only
+    re-lists repos whose fingerprint changed (or went stale), uses the pulls
+    listing ETag to skip unchanged listings, and only refetches details for
+    PRs whose updated_at moved, or whose mergeability may have: unknown at
+    the last fetch, or the repo was pushed to since. Summary refreshes (with_details=False) skip
+    the per-PR detail fetch entirely and keep the listing items.
+    """
+
+    def __init__(self, client: GitHubClient):
+        self.client = client
+        self.repos: dict[str, RepoState] = {}
+        self.stats = {"reused": 0, "not_modified": 0, "relisted": 0}
+        # When the set of repos was last settled by a full discovery
+        self.retained_at: Optional[float] = None
+        # repo: searches over the repos the user can push to, kept from the
+        # last discovery for the PR count
+        self.count_queries: Optional[list[str]] = None
+
+    def has_changed(self, full_name: str, fingerprint: Optional[tuple]) -> bool:
+        # Whether refresh_repo would have to go back to GitHub for this repo
+        state = self.repos.get(full_name)
+        return (
+            state is None
+            or fingerprint is None
+            or state.fingerprint != fingerprint
+            or time.monotonic() - state.checked_at >= settings.REFRESH_MAX_STALENESS
+        )
+
+    def open_pr_count(self, full_name: Optional[str] = None) -> Optional[int]:
+        # From the last listings of one repo (or all of them), as long as
+        # none has gone stale; None if the index can't answer
+        now = time.monotonic()
+        if full_name is None:
+            # Repos without open PRs aren't kept, so only a recent discovery
+            # says the repos here are all there is
+            if (
+                self.retained_at is None
+                or now - self.retained_at >= settings.REFRESH_MAX_STALENESS
+            ):
+                return None
+            states = list(self.repos.values())
+        else:
+            states = [self.repos.get(full_name)]
+        if None in states:
+            return None
+        if any(
+            now - state.checked_at >= settings.REFRESH_MAX_STALENESS for state in states
+        ):
+            return None
+        return sum(len(state.prs) for state in states)
+
+    def forget(self, full_name: str) -> None:
+        self.repos.pop(full_name, None)
+
+    def retain(self, full_names) -> None:
+        # Repos that no longer have open PRs (or lost push access) are dropped
+        for full_name in list(self.repos):
+            if full_name not in full_names:
+                del self.repos[full_name]
+        self.retained_at = time.monotonic()
+
+    async def refresh_repo(
+        self,
+        owner: str,
+        repo: str,
+        fingerprint: Optional[tuple] = None,
+        with_details: bool = True,
+    ) -> list[PullRequestRecord]:
+        full_name = f"{owner}/{repo}"
+        state = self.repos.get(full_name)
+        now = time.monotonic()
+        # A push to the base branch can change every PR's mergeability
+        # without touching their updated_at
+        pushed = (
+            state is not None
+            and state.fingerprint is not None
+            and fingerprint is not None
+            and state.fingerprint[0] != fingerprint[0]
+        )
+
+        if (
+            state is not None
+            and fingerprint is not None
+            and state.fingerprint == fingerprint
+            and now - state.checked_at < settings.REFRESH_MAX_STALENESS
+        ):
+            self.stats["reused"] += 1
+            return await self._complete(owner, repo, state, with_details)
+
+        etag = state.etag if state is not None and state.single_page else None
+        listing, new_etag = await self.client.list_open_prs_if_changed(
+            owner, repo, etag
+        )
+        if listing is None:
+            self.stats["not_modified"] += 1
+            if fingerprint is not None:
+                state.fingerprint = fingerprint
+            state.checked_at = now
+            return await self._complete(owner, repo, state, with_details, pushed)
+
+        self.stats["relisted"] += 1
+        previous = {pr.number: pr for pr in state.prs} if state else {}
+        unchanged = []
+        changed_numbers = []
+        for pr in listing:
+            known = previous.get(pr.number)
+            if (
+                known is not None
+                and known.updated_at == pr.updated_at
+                and (not with_details or details_current(known, pushed))
+            ):
+                unchanged.append(known)
+            elif with_details:
+                changed_numbers.append(pr.number)
+            else:
+                unchanged.append(pr)
+
+        detailed = await asyncio.gather(
+            *[
+                self.client.get_pull_request_record(owner, repo, number)
+                for number in changed_numbers
+            ]
+        )
+        prs = unchanged + list(detailed)
+        order = {pr.number: i for i, pr in enumerate(listing)}
+        prs.sort(key=lambda pr: order[pr.number])
+
+        self.repos[full_name] = RepoState(
+            fingerprint, new_etag, len(listing) < 100, prs
+        )
+        return prs
+
+    def pull_request(
+        self, full_name: str, number: int, detailed: bool = True
+    ) -> Optional[PullRequestRecord]:
+        state = self.repos.get(full_name)
+        if state is None:
+            return None
+        for pr in state.prs:
+            if pr.number == number and (pr.detailed or not detailed):
+                return pr
+        return None
+
+    def remember(self, full_name: str, pr: PullRequestRecord) -> None:
+        # Details fetched outside a refresh (e.g. by hydration) replace the
+        # listing item, as long as the PR hasn't moved on since
+        state = self.repos.get(full_name)
+        if state is None:
+            return
+        for i, known in enumerate(state.prs):
+            if known.number == pr.number:
+                if known.updated_at == pr.updated_at:
+                    state.prs[i] = pr
+                return
+
+    async def _complete(
+        self,
+        owner: str,
+        repo: str,
+        state: RepoState,
+        with_details: bool,
+        pushed: bool = False,
+    ) -> list[PullRequestRecord]:
+        # A listing kept by a summary refresh still needs details before
+        # full cards can be built from it
+        if not with_details:
+            return state.prs
+        missing = [pr.number for pr in state.prs if not details_current(pr, pushed)]
+        if not missing:
+            return state.prs
+        detailed = await asyncio.gather(
+            *[
+                self.client.get_pull_request_record(owner, repo, number)
+                for number in missing
+            ]
+        )
+        by_number = {pr.number: pr for pr in detailed}
+        state.prs = [by_number.get(pr.number, pr) for pr in state.prs]
+        return state.prs
@@ -1,15 +1,47 @@
+import math
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from config import settings
 from auth.router import router as auth_router
 from api.router import router as api_router
+from api.admission import admission
+from api.pipeline import ClientDisconnected, pipeline_metrics
+from api.scheduler import scheduler
+from cache.store import cache
+from github.client import (
+    Conflict,
+    Forbidden,
+    GitHubAPIError,
+    GitHubUnavailable,
+    NotFound,
+    RateLimited,
+    Unauthorized,
+    Unprocessable,
+    close_http_client,
+)
+from github.hedging import latency_tracker
+from github.limiter import limiter_metrics
+from github.metrics import github_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    scheduler.start()
+    yield
+    await scheduler.stop()
+    await close_http_client()
+    await cache.close()
+
 
 app = FastAPI(
     title="PRswipe API",
     description="GitHub Pull Request Tinder App - Backend API",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -18,9 +50,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[
+        "ETag",
+        "X-Snapshot-Version",
+        "X-Queue-Complete",
+        "X-Continuation-Token",
+    ],
+)
+
+
+@app.exception_handler(ClientDisconnected)
+async def client_disconnected_handler(request: Request, exc: ClientDisconnected):
+    # Nobody is left to read the response; 499 keeps it out of the 5xx logs
+    return Response(status_code=499)
+
+
+# Typed failures keep their meaning, so a revoked token is a 401 and a
+# refused merge a 422; anything else GitHub rejected is a bad gateway
+# rather than our own 500
+PASSTHROUGH_ERRORS = (
+    Unauthorized,
+    Forbidden,
+    NotFound,
+    Conflict,
+    Unprocessable,
+    RateLimited,
+    GitHubUnavailable,
 )
 
 
+@app.exception_handler(GitHubAPIError)
+async def github_error_handler(request: Request, exc: GitHubAPIError):
+    if isinstance(exc, PASSTHROUGH_ERRORS):
+        status_code = exc.status_code
+    else:
+        status_code = 502
+    headers = None
+    if exc.retry_after is not None:
+        headers = {"Retry-After": str(math.ceil(exc.retry_after))}
+    return JSONResponse(
+        status_code=status_code,
+        content={
+            "error": type(exc).__name__,
+            "detail": str(exc),
+            "status_code": status_code,
+        },
+        headers=headers,
+    )
+
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     if isinstance(exc, Exception) and str(exc) == "Not authenticated":
@@ -49,3 +127,14 @@ app.include_router(api_router)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy", "service": "pr-swipe-backend"}
+
+
+@app.get("/metrics")
+async def metrics():
+    return {
+        "github": github_metrics.snapshot(),
+        "github_hedge_thresholds": latency_tracker.thresholds(),
+        "github_concurrency_limits": limiter_metrics(),
+        "card_loads": admission.snapshot(),
+        "pipelines": pipeline_metrics.snapshot(),
+    }
@@ -1,6 +1,8 @@
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from config import settings
 
 
 class UserResponse(BaseModel):
@@ -67,12 +69,54 @@ class PRResponse(BaseModel):
     body: Optional[str] = None
     html_url: str
     head_branch: str
+    head_sha: str = ""
     base_branch: str
     repo: str
-    author: PRAuthor
-    stats: PRStats
-    generated_bio: str
-    compatibility_score: int = 50
+    author_login: str = ""
+    draft: bool = False
+    # Summary cards leave these unset until they are hydrated
+    author: Optional[PRAuthor] = None
+    stats: Optional[PRStats] = None
+    generated_bio: Optional[str] = None
+    compatibility_score: Optional[int] = None
+
+
+class PRKey(BaseModel):
+    repo: str
+    number: int
+
+
+class PRDetailsRequest(BaseModel):
+    prs: List[PRKey] = Field(..., max_length=settings.DETAILS_MAX_BATCH)
+
+
+class PRDetailsResult(BaseModel):
+    repo: str
+    number: int
+    # HTTP-style status for this card alone; pr is only set on 200
+    status: int = 200
+    error: Optional[str] = None
+    pr: Optional[PRResponse] = None
+
+
+class PRDetailsResponse(BaseModel):
+    results: List[PRDetailsResult]
+
+
+class PRChangesResponse(BaseModel):
+    version: str
+    reset: bool = False
+    added: List[PRResponse] = []
+    changed: List[PRResponse] = []
+    removed: List[PRKey] = []
+
+
+class PRCountResponse(BaseModel):
+    # None until the user's repos have been listed once
+    count: Optional[int]
+    repo: Optional[str] = None
+    # Where the number came from: snapshot, index, search or unknown
+    source: str
 
 
 class MergeRequest(BaseModel):
@@ -80,6 +124,7 @@ class MergeRequest(BaseModel):
     merge_method: str = "squash"
     commit_title: Optional[str] = None
     commit_message: Optional[str] = None
+    sha: Optional[str] = None
 
 
 class CloseRequest(BaseModel):
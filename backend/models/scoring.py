@@ -0,0 +1,205 @@
+import heapq
+from datetime import datetime, timezone
+from typing import Callable, Optional, Sequence, TypeVar
+
+from github.records import PullRequestCounts, PullRequestRecord
+
+T = TypeVar("T")
+
+DEFAULT_BIO = "Just here to get merged."
+MAX_BIO_LINES = 2
+
+# Stands in for activity that hasn't been fetched (e.g. for summary cards)
+NO_COUNTS = PullRequestCounts()
+
+
+def parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class ScoreColumns:
+    """
+    A batch of PRs laid out column by column, one list per scoring input,
+    so each scoring term is a single pass over one column for the whole
+    batch rather than a function call per PR.
+    """
+
+    __slots__ = (
+        "additions",
+        "deletions",
+        "changed_files",
+        "commits",
+        "comments",
+        "age_days",
+        "draft",
+        "mergeable",
+        "labels",
+        "reviewers",
+    )
+
+    def __init__(
+        self,
+        *,
+        additions: list[int],
+        deletions: list[int],
+        changed_files: list[int],
+        commits: list[int],
+        comments: list[int],
+        age_days: list[int],
+        draft: list[bool],
+        mergeable: list[Optional[bool]],
+        labels: list[frozenset[str]],
+        reviewers: list[int],
+    ):
+        self.additions = additions
+        self.deletions = deletions
+        self.changed_files = changed_files
+        self.commits = commits
+        # Issue comments plus reviews, as the score counts them
+        self.comments = comments
+        self.age_days = age_days
+        self.draft = draft
+        self.mergeable = mergeable
+        self.labels = labels
+        self.reviewers = reviewers
+
+    def __len__(self) -> int:
+        return len(self.age_days)
+
+    @classmethod
+    def from_records(
+        cls,
+        prs: Sequence[PullRequestRecord],
+        counts: Sequence[Optional[PullRequestCounts]],
+        now: Optional[datetime] = None,
+    ) -> "ScoreColumns":
+        now = now or datetime.now(timezone.utc)
+        counts = [c or NO_COUNTS for c in counts]
+        return cls(
+            additions=[c.additions for c in counts],
+            deletions=[c.deletions for c in counts],
+            changed_files=[c.changed_files for c in counts],
+            commits=[c.commits for c in counts],
+            comments=[c.comments + c.reviews for c in counts],
+            age_days=[(now - parse_timestamp(pr.created_at)).days for pr in prs],
+            draft=[pr.draft for pr in prs],
+            mergeable=[pr.mergeable for pr in prs],
+            labels=[frozenset(label.lower() for label in pr.labels) for pr in prs],
+            reviewers=[len(pr.requested_reviewers) for pr in prs],
+        )
+
+    def row(self, i: int) -> dict:
+        # The values bio templates can refer to
+        return {
+            "additions": self.additions[i],
+            "changed_files": self.changed_files[i],
+            "commits": self.commits[i],
+            "age_days": self.age_days[i],
+            "reviewers": self.reviewers[i],
+        }
+
+
+def _clamp(value: int, min_val: int, max_val: int) -> int:
+    return max(min_val, min(max_val, value))
+
+
+def compatibility_scores(columns: ScoreColumns) -> list[int]:
+    terms = (
+        [10 if m is True else (-20 if m is False else 0) for m in columns.mergeable],
+        [_clamp(20 - age, -20, 10) for age in columns.age_days],
+        [-5 if draft else 0 for draft in columns.draft],
+        [5 if n <= 5 else 0 for n in columns.commits],
+        [5 if n <= 10 else 0 for n in columns.changed_files],
+        [5 if n > 0 else 0 for n in columns.comments],
+    )
+    return [_clamp(50 + sum(row), 0, 100) for row in zip(*terms)]
+
+
+class BioRule:
+    __slots__ = ("matches", "render")
+
+    def __init__(self, matches: Callable[[ScoreColumns], list[bool]], template: str):
+        self.matches = matches
+        # Bound once here instead of looking the template up per PR
+        self.render = template.format
+
+
+# In priority order (age, code size, commits, everything else); a bio is
+# the first MAX_BIO_LINES rules that match
+BIO_RULES = (
+    BioRule(
+        lambda c: [age > 30 for age in c.age_days],
+        "I've been waiting {age_days} days for someone to notice me.",
+    ),
+    BioRule(lambda c: [age < 1 for age in c.age_days], "Fresh out today. Still warm."),
+    BioRule(
+        lambda c: [n > 500 for n in c.additions],
+        "I'm not afraid of commitment — +{additions} lines speak for themselves.",
+    ),
+    BioRule(
+        lambda c: [a <= 500 and d > a for a, d in zip(c.additions, c.deletions)],
+        "Minimalist at heart. Here to clean things up.",
+    ),
+    BioRule(
+        lambda c: [a > 1000 and d > 500 for a, d in zip(c.additions, c.deletions)],
+        "I live for chaos and refactors. Let's rewrite everything.",
+    ),
+    BioRule(
+        lambda c: [n == 1 for n in c.changed_files],
+        "Just one file. I don't like to make things complicated.",
+    ),
+    BioRule(
+        lambda c: [n > 20 for n in c.changed_files],
+        "I touched {changed_files} files. I contain multitudes.",
+    ),
+    BioRule(lambda c: [n == 1 for n in c.commits], "One shot, one commit. No regrets."),
+    BioRule(
+        lambda c: [n > 10 for n in c.commits],
+        "{commits} commits deep. I have a complex history.",
+    ),
+    BioRule(lambda c: c.draft, "Still figuring myself out. (Draft PR)"),
+    BioRule(
+        lambda c: [n > 0 for n in c.reviewers],
+        "Already have {reviewers} eyes on me. High demand.",
+    ),
+    BioRule(
+        lambda c: ["bug" in labels for labels in c.labels],
+        "I fix broken things. That includes bugs and bad relationships.",
+    ),
+    BioRule(
+        lambda c: ["feature" in labels and "bug" not in labels for labels in c.labels],
+        "Here to add value to your life.",
+    ),
+    BioRule(
+        lambda c: [
+            "hotfix" in labels and labels.isdisjoint({"bug", "feature"})
+            for labels in c.labels
+        ],
+        "Emergency services, but make it code.",
+    ),
+)
+
+
+def generate_bios(columns: ScoreColumns) -> list[str]:
+    matched: list[list[BioRule]] = [[] for _ in range(len(columns))]
+    for rule in BIO_RULES:
+        for rules, hit in zip(matched, rule.matches(columns)):
+            if hit and len(rules) < MAX_BIO_LINES:
+                rules.append(rule)
+    return [
+        "\n".join(rule.render(**columns.row(i)) for rule in rules) or DEFAULT_BIO
+        for i, rules in enumerate(matched)
+    ]
+
+
+def top_k_first(items: list[T], key: Callable[[T], float], k: int) -> list[T]:
+    """
+    The k items with the highest key, best first, followed by the rest in
+    their original order. Picks the first page with a heap in O(n log k)
+    instead of sorting the whole backlog.
+    """
+    top = heapq.nlargest(k, range(len(items)), key=lambda i: key(items[i]))
+    chosen = set(top)
+    return [items[i] for i in top] + [
+        item for i, item in enumerate(items) if i not in chosen
+    ]
@@ -0,0 +1,163 @@
+import secrets
+import time
+from typing import List, Optional
+
+from pydantic import TypeAdapter
+
+from config import settings
+from models.schemas import PRChangesResponse, PRKey, PRResponse
+
+PR_LIST = TypeAdapter(List[PRResponse])
+
+# Removed-card tombstones kept for clients that are behind; older clients get
+# a full reset instead of a diff
+MAX_TOMBSTONES = 1000
+
+
+def card_key(pr: PRResponse) -> tuple[str, int]:
+    return (pr.repo, pr.number)
+
+
+def card_fingerprint(pr: PRResponse) -> tuple:
+    # Summary cards carry no stats, so only their own fields count
+    return (
+        pr.head_sha,
+        pr.title,
+        pr.draft,
+        pr.stats.mergeable if pr.stats else None,
+        tuple(pr.stats.labels) if pr.stats else (),
+    )
+
+
+class SnapshotEntry:
+    __slots__ = ("card", "fingerprint", "added_version", "changed_version")
+
+    def __init__(self, card: PRResponse, version: int):
+        self.card = card
+        self.fingerprint = card_fingerprint(card)
+        self.added_version = version
+        self.changed_version = version
+
+
+class PRSnapshot:
+    """
+    A user's last computed PR queue plus enough version history to tell a
+    client which cards were added, changed or removed since the version it
+    holds. Version tokens are "<epoch>.<version>"; the epoch changes whenever
+    the snapshot is recreated so stale tokens force a reset.
+    """
+
+    def __init__(self, include: Optional[dict] = None):
+        # Serialization spec for cards, from the request's field set
+        self.include = include
+        self.epoch = secrets.token_hex(4)
+        self.version = 0
+        self.entries: dict[tuple[str, int], SnapshotEntry] = {}
+        self.tombstones: dict[tuple[str, int], int] = {}
+        # Oldest version a diff can still be computed from
+        self.horizon = 0
+        self.refreshed_at: Optional[float] = None
+        self._body: Optional[bytes] = None
+
+    @property
+    def token(self) -> str:
+        return f"{self.epoch}.{self.version}"
+
+    @property
+    def cards(self) -> list[PRResponse]:
+        return [entry.card for entry in self.entries.values()]
+
+    def is_fresh(self) -> bool:
+        return (
+            self.refreshed_at is not None
+            and time.monotonic() - self.refreshed_at < settings.RESPONSE_MAX_AGE
+        )
+
+    def body(self) -> bytes:
+        if self._body is None:
+            self._body = PR_LIST.dump_json(self.cards, include=self.include)
+        return self._body
+
+    def discard(self, repo: str, number: int) -> None:
+        # Cards merged or closed through us leave the snapshot right away
+        if self.entries.pop((repo, number), None) is not None:
+            self.version += 1
+            self.tombstones[(repo, number)] = self.version
+            self._body = None
+            self._trim_tombstones()
+
+    def update(self, cards: list[PRResponse], complete: bool = True) -> None:
+        # A partial update (cards from a load still running) only adds and
+        # changes cards, and leaves the snapshot due for a full refresh
+        if complete:
+            self.refreshed_at = time.monotonic()
+        self._body = None
+        next_version = self.version + 1
+        changed = False
+        incoming = {card_key(card): card for card in cards}
+
+        for key in list(self.entries) if complete else ():
+            if key not in incoming:
+                del self.entries[key]
+                self.tombstones[key] = next_version
+                changed = True
+
+        for key, card in incoming.items():
+            entry = self.entries.get(key)
+            if entry is None:
+                self.entries[key] = SnapshotEntry(card, next_version)
+                self.tombstones.pop(key, None)
+                changed = True
+                continue
+            fingerprint = card_fingerprint(card)
+            if fingerprint != entry.fingerprint:
+                entry.fingerprint = fingerprint
+                entry.changed_version = next_version
+                changed = True
+            entry.card = card
+
+        if complete:
+            # Entries follow the incoming order, so a ranked queue stays
+            # ranked in the full body and in diffs after every refresh
+            self.entries = {key: self.entries[key] for key in incoming}
+
+        if changed:
+            self.version = next_version
+            self._trim_tombstones()
+
+    def changes_since(self, token: Optional[str]) -> PRChangesResponse:
+        since = self._parse(token)
+        if since is None or since < self.horizon or since > self.version:
+            return PRChangesResponse(version=self.token, reset=True, added=self.cards)
+
+        added, changed = [], []
+        for entry in self.entries.values():
+            if entry.added_version > since:
+                added.append(entry.card)
+            elif entry.changed_version > since:
+                changed.append(entry.card)
+        removed = [
+            PRKey(repo=repo, number=number)
+            for (repo, number), version in self.tombstones.items()
+            if version > since
+        ]
+        return PRChangesResponse(
+            version=self.token, added=added, changed=changed, removed=removed
+        )
+
+    def _parse(self, token: Optional[str]) -> Optional[int]:
+        if not token:
+            return None
+        epoch, _, version = token.partition(".")
+        if epoch != self.epoch or not version.isdigit():
+            return None
+        return int(version)
+
+    def _trim_tombstones(self) -> None:
+        if len(self.tombstones) <= MAX_TOMBSTONES:
+            return
+        ordered = sorted(self.tombstones.items(), key=lambda item: item[1])
+        dropped = ordered[: len(ordered) - MAX_TOMBSTONES]
+        for key, _ in dropped:
+            del self.tombstones[key]
+        self.horizon = dropped[-1][1]
@@ -0,0 +1,28 @@
+import contextlib
+from typing import AsyncIterator
+
+import httpx
+
+from auth.session import session_manager
+from bench.fake_github import FakeGitHub
+from main import app
+
+
+def auth_headers(login: str) -> dict:
+    # A session token like the one the OAuth callback hands out; a fresh
+    # login per test keeps snapshots and caches from leaking between them
+    token = session_manager.serializer.dumps(
+        {"github_token": f"test-{login}", "user": {"login": login}}
+    )
+    return {"Authorization": f"Bearer {token}"}
+
+
+@contextlib.asynccontextmanager
+async def fake_api(fake: FakeGitHub) -> AsyncIterator[httpx.AsyncClient]:
+    transport = httpx.ASGITransport(app=app)
+    async with (
+        app.router.lifespan_context(app),
+        httpx.AsyncClient(transport=transport, base_url="http://test") as http,
+    ):
+        fake.install()
+        yield http
@@ -0,0 +1,44 @@
+import asyncio
+
+import pytest
+
+from cache.base import CacheBackend
+from cache.sqlite import SQLiteCache
+
+
+def stored_bytes(cache: SQLiteCache) -> tuple[int, int]:
+    (summed,) = cache._conn.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM entries"
+    ).fetchone()
+    return cache._total(), summed
+
+
+def test_sqlite_byte_total_tracks_every_write(tmp_path):
+    async def run():
+        path = str(tmp_path / "cache.db")
+        # Two workers sharing the file; each one's writes count for both
+        first = SQLiteCache(path, max_bytes=1000)
+        second = SQLiteCache(path, max_bytes=1000)
+        await first.set("a", b"x" * 100, 60)
+        await second.set("b", b"x" * 100, 60)
+        await first.set("a", b"x" * 300, 60)
+        await second.delete("b")
+        after_writes = stored_bytes(first)
+        await first.set_many({f"k{i}": b"x" * 200 for i in range(10)}, 60)
+        after_eviction = stored_bytes(second)
+        await second.clear()
+        after_clear = stored_bytes(first)
+        for cache in (first, second):
+            await cache.close()
+        return after_writes, after_eviction, after_clear
+
+    after_writes, after_eviction, after_clear = asyncio.run(run())
+    assert after_writes == (301, 301)
+    total, summed = after_eviction
+    assert total == summed <= 1000
+    assert after_clear == (0, 0)
+
+
+def test_cache_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
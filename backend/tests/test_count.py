@@ -0,0 +1,38 @@
+import asyncio
+
+from auth.session import session_registry
+from bench.fake_github import FakeGitHub
+from conftest import auth_headers, fake_api
+
+
+def test_count_before_and_after_a_load():
+    # Before any load the count is unknown and costs nothing upstream. After
+    # one, it searches the pushable repos, split like discovery's queries.
+    async def run():
+        fake = FakeGitHub(repos=60, prs_per_repo=30)
+        headers = auth_headers("counter")
+        async with fake_api(fake) as http:
+            cold = await http.get("/api/prs/count", headers=headers)
+            cold_calls = fake.calls
+            one_repo = await http.get(
+                "/api/prs/count", params={"repo": "acme/repo3"}, headers=headers
+            )
+            await http.get("/api/prs/all", params={"view": "summary"}, headers=headers)
+            # With the snapshot and listings gone only the searches can answer
+            session = session_registry.resolve(headers["Authorization"][7:])
+            session.state["snapshots"].clear()
+            engine = session.state["refresh_engine"]
+            engine.repos.clear()
+            engine.retained_at = None
+            before = fake.calls
+            warm = await http.get("/api/prs/count", headers=headers)
+            searches = fake.calls - before
+        return cold, cold_calls, one_repo, warm, searches, engine.count_queries
+
+    cold, cold_calls, one_repo, warm, searches, queries = asyncio.run(run())
+    assert cold.json() == {"count": None, "repo": None, "source": "unknown"}
+    assert cold_calls == 0
+    assert one_repo.json() == {"count": 30, "repo": "acme/repo3", "source": "search"}
+    assert warm.json() == {"count": 1800, "repo": None, "source": "search"}
+    assert 1 < len(queries) == searches
+    assert all(len(query) <= 256 for query in queries)
@@ -0,0 +1,26 @@
+import asyncio
+
+from bench.fake_github import FakeGitHub
+from conftest import auth_headers, fake_api
+
+
+def test_body_without_enrichment():
+    # title and body need neither the author nor the stats, so the cards are
+    # built from the listing alone
+    async def run():
+        fake = FakeGitHub(repos=2, prs_per_repo=3)
+        async with fake_api(fake) as http:
+            params = {"fields": "title,body"}
+            headers = auth_headers("body-reader")
+            listed = await http.get(
+                "/api/prs", params={**params, "repo": "acme/repo1"}, headers=headers
+            )
+            queue = await http.get("/api/prs/all", params=params, headers=headers)
+        return fake, listed, queue
+
+    fake, listed, queue = asyncio.run(run())
+    assert listed.status_code == 200 and queue.status_code == 200
+    assert len(listed.json()) == 3 and len(queue.json()) == 6
+    for card in listed.json() + queue.json():
+        assert card["body"] == fake.body
+        assert set(card) == {"repo", "number", "title", "body"}
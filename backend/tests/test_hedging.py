@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+
+from github.hedging import LatencyTracker, hedge_budget, hedged_send, latency_tracker
+from github.metrics import github_metrics
+
+KEY = "/test/hedging"
+
+
+def test_queueing_for_a_slot_is_not_hedged_or_sampled():
+    async def run():
+        latency_tracker._thresholds[KEY] = 0.05
+        hedge_budget.tokens = hedge_budget.burst
+        calls = []
+
+        async def send(on_wire):
+            calls.append(on_wire)
+            # Queued for a limiter slot well past the hedge delay...
+            await asyncio.sleep(0.2)
+            on_wire()
+            # ...then answered quickly once on the wire
+            await asyncio.sleep(0.01)
+            return httpx.Response(200)
+
+        hedges = github_metrics.hedges
+        response = await hedged_send(KEY, send, can_hedge=lambda: True)
+        return response, len(calls), github_metrics.hedges - hedges
+
+    response, calls, hedges = asyncio.run(run())
+    assert response.status_code == 200
+    assert calls == 1 and hedges == 0
+    assert max(latency_tracker._samples[KEY]) < 0.1
+
+
+def test_no_hedge_without_a_free_slot():
+    async def run():
+        latency_tracker._thresholds[KEY] = 0.01
+        hedge_budget.tokens = hedge_budget.burst
+        calls = []
+
+        async def send(on_wire):
+            calls.append(on_wire)
+            on_wire()
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+
+        await hedged_send(KEY, send, can_hedge=lambda: False)
+        await hedged_send(KEY, send, can_hedge=lambda: True)
+        del latency_tracker._thresholds[KEY]
+        return len(calls)
+
+    # One call for the first send; a primary and a hedge for the second
+    assert asyncio.run(run()) == 3
+
+
+def test_tracker_quantile():
+    tracker = LatencyTracker(window=100, quantile=0.9, min_samples=10)
+    for i in range(100):
+        tracker.record(KEY, i / 100)
+    assert tracker.threshold(KEY) == 0.9
+
+
+def test_tracker_full_window_recomputes_every_tenth_sample():
+    tracker = LatencyTracker(window=20, quantile=0.9, min_samples=10)
+    for _ in range(20):
+        tracker.record(KEY, 0.1)
+    # The window is full; slower samples move the threshold only once ten
+    # of them have arrived
+    for _ in range(9):
+        tracker.record(KEY, 1.0)
+    assert tracker.threshold(KEY) == 0.1
+    tracker.record(KEY, 1.0)
+    assert tracker.threshold(KEY) == 1.0
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+
+from fastapi import HTTPException
+
+from api.prs import _background_done
+from bench.fake_github import FakeGitHub
+from conftest import auth_headers, fake_api
+from github.limiter import AdaptiveLimiter
+
+
+def test_urgent_waiters_go_first():
+    async def run():
+        limiter = AdaptiveLimiter(initial=1, minimum=1, maximum=1)
+        await limiter.acquire()
+        order = []
+
+        async def call(name, urgent):
+            await limiter.acquire(urgent=urgent)
+            order.append(name)
+            limiter.release("test", 0.01, False)
+
+        waiters = [
+            asyncio.create_task(call("card", False)),
+            asyncio.create_task(call("card", False)),
+            asyncio.create_task(call("close", True)),
+        ]
+        await asyncio.sleep(0)
+        limiter.release("test", 0.01, False)
+        await asyncio.gather(*waiters)
+        return order
+
+    assert asyncio.run(run()) == ["close", "card", "card"]
+
+
+def test_close_does_not_wait_for_mergeability():
+    async def run():
+        fake = FakeGitHub(repos=1, prs_per_repo=1)
+        pull = fake._pull
+        # GitHub answers null while it is still computing mergeability
+        fake._pull = lambda repo, number: {**pull(repo, number), "mergeable": None}
+        async with fake_api(fake) as http:
+            start = time.monotonic()
+            response = await http.post(
+                "/api/prs/1/close",
+                json={"repo": "acme/repo1"},
+                headers=auth_headers("closer"),
+            )
+            return response, time.monotonic() - start
+
+    response, seconds = asyncio.run(run())
+    assert response.status_code == 200
+    assert seconds < 1
+
+
+def test_shed_background_load_is_not_a_warning(caplog):
+    async def run():
+        async def shed():
+            raise HTTPException(status_code=503, detail="Too many card loads")
+
+        async def broken():
+            raise RuntimeError("boom")
+
+        for work in (shed, broken):
+            task = asyncio.create_task(work())
+            await asyncio.gather(task, return_exceptions=True)
+            _background_done(task)
+
+    with caplog.at_level(logging.DEBUG, logger="api.prs"):
+        asyncio.run(run())
+    levels = {record.getMessage(): record.levelno for record in caplog.records}
+    assert levels == {
+        "Background load shed: Too many card loads": logging.DEBUG,
+        "Background load failed: RuntimeError('boom')": logging.WARNING,
+    }
@@ -0,0 +1,42 @@
+import asyncio
+
+from api.fields import FULL, SUMMARY
+from api.prs import queue_key
+from api.warmup import refresh_queues
+from auth.session import session_registry
+from bench.fake_github import FakeGitHub
+from config import settings
+from conftest import auth_headers, fake_api
+
+
+def test_session_keeps_recent_queues_only():
+    async def run():
+        fake = FakeGitHub(repos=2, prs_per_repo=3)
+        headers = auth_headers("queues")
+        async with fake_api(fake) as http:
+            for order in ("random", "age", "score"):
+                await http.get(
+                    "/api/prs/all",
+                    params={"view": "summary", "order": order},
+                    headers=headers,
+                )
+            await http.get(
+                "/api/prs/all", params={"view": "full", "order": "age"}, headers=headers
+            )
+            session = session_registry.resolve(headers["Authorization"][7:])
+            kept = list(session.state["queues"])
+            snapshots = set(session.state["snapshots"])
+            # A background refresh of a dropped queue doesn't bring it back
+            await refresh_queues(session, [(SUMMARY, "random")])
+            after = list(session.state["queues"]), set(session.state["snapshots"])
+        return kept, snapshots, after
+
+    kept, snapshots, after = asyncio.run(run())
+    assert settings.SESSION_MAX_QUEUES == 3
+    assert kept == [
+        queue_key(SUMMARY, "age"),
+        queue_key(SUMMARY, "score"),
+        queue_key(FULL, "age"),
+    ]
+    assert snapshots == set(kept)
+    assert after == (kept, snapshots)
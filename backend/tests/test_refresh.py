@@ -0,0 +1,44 @@
+import asyncio
+
+from github.records import PullRequestRecord
+from github.refresh import RefreshEngine
+
+PR = {"number": 1, "updated_at": "2026-01-01T00:00:00Z"}
+
+
+class Client:
+    # Just the two calls refresh_repo makes; the listing always changes
+    def __init__(self):
+        self.mergeable = None
+        self.details = 0
+
+    async def list_open_prs_if_changed(self, owner, repo, etag):
+        return [PullRequestRecord(PR, detailed=False)], None
+
+    async def get_pull_request_record(self, owner, repo, number):
+        self.details += 1
+        return PullRequestRecord({**PR, "mergeable": self.mergeable})
+
+
+def test_mergeability_is_refetched():
+    async def run():
+        client = Client()
+        engine = RefreshEngine(client)
+        first = await engine.refresh_repo("acme", "app", ("t1", "u1", 1))
+        # Still being computed at the first fetch, so asked again
+        client.mergeable = True
+        second = await engine.refresh_repo("acme", "app", ("t1", "u2", 1))
+        # Known now, and nothing was pushed: reused
+        await engine.refresh_repo("acme", "app", ("t1", "u3", 1))
+        reused = client.details
+        # A push (to the base, say) may have changed it
+        client.mergeable = False
+        third = await engine.refresh_repo("acme", "app", ("t2", "u3", 1))
+        return first, second, reused, third, client.details
+
+    first, second, reused, third, details = asyncio.run(run())
+    assert first[0].mergeable is None
+    assert second[0].mergeable is True
+    assert reused == 2
+    assert third[0].mergeable is False
+    assert details == 3
@@ -0,0 +1,164 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+from github.records import PullRequestCounts, PullRequestRecord
+from models.bio import compute_compatibility_score, generate_pr_bio
+from models.scoring import (
+    ScoreColumns,
+    compatibility_scores,
+    generate_bios,
+    top_k_first,
+)
+
+NOW = datetime(2026, 1, 1, tzinfo=timezone.utc)
+LABELS = ["bug", "feature", "hotfix", "docs"]
+
+
+def reference_bio(
+    additions, deletions, changed_files, commits, age_days, draft, labels, reviewers
+):
+    # The per-PR rules the batch code replaced, in priority order
+    lines = []
+    if age_days > 30:
+        lines.append(f"I've been waiting {age_days} days for someone to notice me.")
+    elif age_days < 1:
+        lines.append("Fresh out today. Still warm.")
+    if additions > 500:
+        lines.append(
+            f"I'm not afraid of commitment — +{additions} lines speak for themselves."
+        )
+    elif deletions > additions:
+        lines.append("Minimalist at heart. Here to clean things up.")
+    if additions > 1000 and deletions > 500:
+        lines.append("I live for chaos and refactors. Let's rewrite everything.")
+    if changed_files == 1:
+        lines.append("Just one file. I don't like to make things complicated.")
+    elif changed_files > 20:
+        lines.append(f"I touched {changed_files} files. I contain multitudes.")
+    if commits == 1:
+        lines.append("One shot, one commit. No regrets.")
+    elif commits > 10:
+        lines.append(f"{commits} commits deep. I have a complex history.")
+    if draft:
+        lines.append("Still figuring myself out. (Draft PR)")
+    if reviewers:
+        lines.append(f"Already have {reviewers} eyes on me. High demand.")
+    if "bug" in labels:
+        lines.append("I fix broken things. That includes bugs and bad relationships.")
+    elif "feature" in labels:
+        lines.append("Here to add value to your life.")
+    elif "hotfix" in labels:
+        lines.append("Emergency services, but make it code.")
+    return "\n".join(lines[:2]) or "Just here to get merged."
+
+
+def reference_score(mergeable, age_days, draft, commits, changed_files, comments):
+    score = (
+        50
+        + (10 if mergeable is True else (-20 if mergeable is False else 0))
+        + max(-20, min(10, 20 - age_days))
+        - (5 if draft else 0)
+        + (5 if commits <= 5 else 0)
+        + (5 if changed_files <= 10 else 0)
+        + (5 if comments > 0 else 0)
+    )
+    return max(0, min(100, score))
+
+
+def random_pr(rng: random.Random) -> tuple[PullRequestRecord, PullRequestCounts]:
+    created = NOW - timedelta(
+        days=rng.choice([0, 1, 5, 20, 31, 90]), hours=rng.randrange(24)
+    )
+    record = PullRequestRecord(
+        {
+            "number": 1,
+            "created_at": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "draft": rng.random() < 0.3,
+            "mergeable": rng.choice([True, False, None]),
+            "labels": [{"name": name} for name in rng.sample(LABELS, rng.randrange(3))],
+            "requested_reviewers": [{"login": "r"}] * rng.randrange(3),
+        },
+        detailed=True,
+    )
+    counts = PullRequestCounts()
+    counts.additions = rng.choice([0, 10, 501, 1001, 2000])
+    counts.deletions = rng.choice([0, 20, 501, 3000])
+    counts.changed_files = rng.choice([0, 1, 5, 11, 21])
+    counts.commits = rng.choice([0, 1, 5, 6, 11])
+    counts.comments = rng.randrange(2)
+    counts.reviews = rng.randrange(2)
+    return record, counts
+
+
+def test_batch_scoring_matches_per_pr_rules():
+    rng = random.Random(40)
+    pairs = [random_pr(rng) for _ in range(20_000)]
+    columns = ScoreColumns.from_records(
+        [pr for pr, _ in pairs], [counts for _, counts in pairs], now=NOW
+    )
+    scores = compatibility_scores(columns)
+    bios = generate_bios(columns)
+    for i, (pr, counts) in enumerate(pairs):
+        age_days = columns.age_days[i]
+        labels = [label.lower() for label in pr.labels]
+        expected_bio = reference_bio(
+            counts.additions,
+            counts.deletions,
+            counts.changed_files,
+            counts.commits,
+            age_days,
+            pr.draft,
+            labels,
+            len(pr.requested_reviewers),
+        )
+        expected_score = reference_score(
+            pr.mergeable,
+            age_days,
+            pr.draft,
+            counts.commits,
+            counts.changed_files,
+            counts.comments + counts.reviews,
+        )
+        assert bios[i] == expected_bio
+        assert scores[i] == expected_score
+        # The single-PR wrappers agree with the batch
+        assert (
+            generate_pr_bio(
+                counts.additions,
+                counts.deletions,
+                counts.changed_files,
+                counts.commits,
+                age_days,
+                pr.draft,
+                labels,
+                list(pr.requested_reviewers),
+            )
+            == expected_bio
+        )
+        assert (
+            compute_compatibility_score(
+                pr.mergeable,
+                age_days,
+                pr.draft,
+                counts.commits,
+                counts.changed_files,
+                counts.comments + counts.reviews,
+            )
+            == expected_score
+        )
+
+
+def test_top_k_first():
+    rng = random.Random(7)
+    for _ in range(2_000):
+        items = [rng.randrange(20) for _ in range(rng.randrange(60))]
+        k = rng.randrange(30)
+        ranked = top_k_first(list(enumerate(items)), key=lambda item: item[1], k=k)
+        head, tail = ranked[:k], ranked[k:]
+        assert sorted(ranked) == list(enumerate(items))
+        # Best first, and nothing left behind beats the first page
+        assert [v for _, v in head] == sorted(items, reverse=True)[: len(head)]
+        if head and tail:
+            assert min(v for _, v in head) >= max(v for _, v in tail)
+        # The rest keeps its original order
+        assert tail == sorted(tail)
@@ -0,0 +1,38 @@
+from models.schemas import PRResponse
+from models.snapshot import PRSnapshot
+
+
+def card(number: int, score: int) -> PRResponse:
+    return PRResponse(
+        number=number,
+        title=f"PR {number}",
+        html_url="",
+        head_branch="feature",
+        head_sha=f"sha{number}",
+        base_branch="main",
+        repo="acme/repo1",
+        author_login="dev",
+        draft=False,
+        compatibility_score=score,
+    )
+
+
+def ranked(cards: list[PRResponse]) -> list[PRResponse]:
+    return sorted(cards, key=lambda c: c.compatibility_score, reverse=True)
+
+
+def test_refresh_keeps_ranked_order():
+    snapshot = PRSnapshot()
+    first = ranked([card(n, 20 + n) for n in range(1, 6)])
+    snapshot.update(first)
+    token = snapshot.token
+
+    # Two new PRs outrank everything already queued
+    second = ranked(first[1:] + [card(10, 95), card(11, 90)])
+    snapshot.update(second)
+
+    assert [c.number for c in snapshot.cards] == [c.number for c in second]
+    assert snapshot.body().index(b'"number":10') < snapshot.body().index(b'"number":4')
+    changes = snapshot.changes_since(token)
+    assert [c.number for c in changes.added] == [10, 11]
+    assert [(pr.repo, pr.number) for pr in changes.removed] == [("acme/repo1", 5)]
@@ -1,7 +1,15 @@
-import axios from "axios";
+import axios, { InternalAxiosRequestConfig } from "axios";
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || "";
 
+interface CachedResponse {
+  etag: string;
+  data: unknown;
+}
+
+// Last body seen per GET URL, replayed when the server answers 304
+const etagCache = new Map<string, CachedResponse>();
+
 export const getAuthToken = (): string | null => {
   return localStorage.getItem("pr_swipe_token");
 };
@@ -12,6 +20,7 @@ export const setAuthToken = (token: string): void => {
 
 export const clearAuthToken = (): void => {
   localStorage.removeItem("pr_swipe_token");
+  etagCache.clear();
 };
 
 export const apiClient = axios.create({
@@ -21,16 +30,43 @@ export const apiClient = axios.create({
   },
 });
 
+const etagCacheKey = (config: InternalAxiosRequestConfig): string =>
+  apiClient.getUri({ url: config.url, params: config.params });
+
 apiClient.interceptors.request.use((config) => {
   const token = getAuthToken();
   if (token) {
     config.headers.Authorization = `Bearer ${token}`;
   }
+  if ((config.method ?? "get").toLowerCase() === "get") {
+    const cached = etagCache.get(etagCacheKey(config));
+    if (cached) {
+      config.headers["If-None-Match"] = cached.etag;
+    }
+    config.validateStatus = (status) =>
+      (status >= 200 && status < 300) || status === 304;
+  }
   return config;
 });
 
 apiClient.interceptors.response.use(
-  (response) => response,
+  (response) => {
+    if ((response.config.method ?? "get").toLowerCase() !== "get") {
+      return response;
+    }
+    const key = etagCacheKey(response.config);
+    if (response.status === 304) {
+      const cached = etagCache.get(key);
+      if (cached) {
+        return { ...response, status: 200, data: cached.data };
+      }
+    }
+    const etag = response.headers["etag"];
+    if (etag) {
+      etagCache.set(key, { etag, data: response.data });
+    }
+    return response;
+  },
   (error) => {
     if (error.response?.status === 401) {
       clearAuthToken();
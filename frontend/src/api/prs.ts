@@ -29,15 +29,52 @@ export interface PRStats {
 export interface PR {
   number: number;
   title: string;
-  body: string | null;
   html_url: string;
   head_branch: string;
+  head_sha: string;
   base_branch: string;
   repo: string;
-  author: PRAuthor;
-  stats: PRStats;
-  generated_bio: string;
-  compatibility_score: number;
+  author_login: string;
+  draft: boolean;
+  // Summary cards arrive without these until they are hydrated
+  body?: string | null;
+  author?: PRAuthor | null;
+  stats?: PRStats | null;
+  generated_bio?: string | null;
+  compatibility_score?: number | null;
+}
+
+export type PRView = "full" | "summary";
+
+export type PROrder = "score" | "age" | "random";
+
+export interface PRKey {
+  repo: string;
+  number: number;
+}
+
+export interface PRSnapshot {
+  prs: PR[];
+  version: string | null;
+  // False when the deadline ran out first; the rest arrives as a diff
+  // from `version` once the server finishes loading
+  complete: boolean;
+}
+
+export interface PRChanges {
+  version: string;
+  reset: boolean;
+  added: PR[];
+  changed: PR[];
+  removed: PRKey[];
+}
+
+export interface PRDetailsResult {
+  repo: string;
+  number: number;
+  status: number;
+  error: string | null;
+  pr: PR | null;
 }
 
 export interface MergeRequest {
@@ -45,6 +82,7 @@ export interface MergeRequest {
   merge_method?: string;
   commit_title?: string;
   commit_message?: string;
+  sha?: string;
 }
 
 export interface CloseRequest {
@@ -66,18 +104,69 @@ export interface CloseResponse {
   state: string;
 }
 
-export const getPRs = async (repo: string): Promise<PR[]> => {
+export const isHydrated = (pr: PR): boolean => pr.stats != null;
+
+export const getPRs = async (
+  repo: string,
+  view: PRView = "full",
+): Promise<PR[]> => {
   const response = await apiClient.get<PR[]>("/api/prs", {
-    params: { repo },
+    params: { repo, view },
+  });
+  return response.data;
+};
+
+export const getAllPRs = async (
+  view: PRView = "full",
+  order: PROrder = "random",
+  deadlineMs?: number,
+): Promise<PRSnapshot> => {
+  const response = await apiClient.get<PR[]>("/api/prs/all", {
+    params: deadlineMs
+      ? { view, order, deadline_ms: deadlineMs }
+      : { view, order },
+  });
+  return {
+    prs: response.data,
+    version: response.headers["x-snapshot-version"] ?? null,
+    complete: response.headers["x-queue-complete"] !== "false",
+  };
+};
+
+export const getPRChanges = async (
+  since: string | null,
+  view: PRView = "full",
+  order: PROrder = "random",
+): Promise<PRChanges> => {
+  const response = await apiClient.get<PRChanges>("/api/prs/all/changes", {
+    params: since ? { since, view, order } : { view, order },
   });
   return response.data;
 };
 
-export const getAllPRs = async (): Promise<PR[]> => {
-  const response = await apiClient.get<PR[]>("/api/prs/all");
+export interface PRCount {
+  count: number | null;
+  repo: string | null;
+  source: "snapshot" | "index" | "search" | "unknown";
+}
+
+export const getPRCount = async (repo?: string): Promise<PRCount> => {
+  const response = await apiClient.get<PRCount>("/api/prs/count", {
+    params: repo ? { repo } : {},
+  });
   return response.data;
 };
 
+export const getPRDetails = async (
+  prs: PRKey[],
+): Promise<PRDetailsResult[]> => {
+  const response = await apiClient.post<{ results: PRDetailsResult[] }>(
+    "/api/prs/details",
+    { prs: prs.map(({ repo, number }) => ({ repo, number })) },
+  );
+  return response.data.results;
+};
+
 export const mergePR = async (
   prNumber: number,
   data: MergeRequest,
@@ -45,6 +45,7 @@ export function PRCard({
 
   const {
     author,
+    author_login,
     stats,
     generated_bio,
     compatibility_score,
@@ -53,6 +54,10 @@ export function PRCard({
     repo,
   } = pr;
 
+  // Summary cards render from the login alone until hydration fills them in
+  const avatarUrl =
+    author?.avatar_url || `https://github.com/${author_login}.png`;
+
   const handleDragEnd = (_: any, info: PanInfo) => {
     if (!isTopCard) return;
 
@@ -95,8 +100,8 @@ export function PRCard({
       {/* 1. Immersive Background Image */}
       <div className="absolute inset-0 w-full h-full">
         <img
-          src={author.avatar_url}
-          alt={author.login}
+          src={avatarUrl}
+          alt={author_login}
           className="w-full h-full object-cover pointer-events-none"
         />
         {/* The Tinder Gradient - Essential for text readability */}
@@ -112,11 +117,13 @@ export function PRCard({
         <div className="flex items-end justify-between">
           <div className="flex items-baseline gap-2">
             <h3 className="text-3xl font-bold text-white tracking-tight">
-              {author.name || author.login}
+              {author?.name || author_login}
             </h3>
-            <span className="text-2xl text-white/90 font-light">
-              {stats.age_days}
-            </span>
+            {stats && (
+              <span className="text-2xl text-white/90 font-light">
+                {stats.age_days}
+              </span>
+            )}
           </div>
           <button className="p-1 rounded-full bg-white/10 backdrop-blur-md border border-white/20">
             <Info className="w-5 h-5 text-white" />
@@ -132,48 +139,56 @@ export function PRCard({
         </div>
 
         {/* Bio - Italicized and limited */}
-        <p className="text-white/80 text-sm line-clamp-2 italic leading-snug">
-          "{generated_bio}"
-        </p>
+        {generated_bio ? (
+          <p className="text-white/80 text-sm line-clamp-2 italic leading-snug">
+            "{generated_bio}"
+          </p>
+        ) : (
+          <div className="h-4 w-3/4 rounded bg-white/10 animate-pulse" />
+        )}
 
         {/* Stats Grid */}
-        <div className="flex items-center gap-4 py-2">
-          <div className="flex items-center gap-1.5">
-            <div className="p-1 bg-[#00e676]/20 rounded">
-              <Plus className="w-3 h-3 text-[#00e676]" />
+        {stats && (
+          <div className="flex items-center gap-4 py-2">
+            <div className="flex items-center gap-1.5">
+              <div className="p-1 bg-[#00e676]/20 rounded">
+                <Plus className="w-3 h-3 text-[#00e676]" />
+              </div>
+              <span className="text-[#00e676] font-mono text-sm">
+                +{stats.additions}
+              </span>
             </div>
-            <span className="text-[#00e676] font-mono text-sm">
-              +{stats.additions}
-            </span>
-          </div>
-          <div className="flex items-center gap-1.5">
-            <div className="p-1 bg-[#ff1744]/20 rounded">
-              <Minus className="w-3 h-3 text-[#ff1744]" />
+            <div className="flex items-center gap-1.5">
+              <div className="p-1 bg-[#ff1744]/20 rounded">
+                <Minus className="w-3 h-3 text-[#ff1744]" />
+              </div>
+              <span className="text-[#ff1744] font-mono text-sm">
+                -{stats.deletions}
+              </span>
+            </div>
+            <div className="flex items-center gap-1.5 text-white/60">
+              <FileCode className="w-4 h-4" />
+              <span className="font-mono text-sm">{stats.changed_files}</span>
             </div>
-            <span className="text-[#ff1744] font-mono text-sm">
-              -{stats.deletions}
-            </span>
-          </div>
-          <div className="flex items-center gap-1.5 text-white/60">
-            <FileCode className="w-4 h-4" />
-            <span className="font-mono text-sm">{stats.changed_files}</span>
           </div>
-        </div>
+        )}
 
         {/* Compatibility Bar */}
-        <div className="space-y-1.5">
-          <div className="flex justify-between text-[10px] font-bold text-white/50 uppercase tracking-widest">
-            <span>Match Score</span>
-            <span className="text-[#00e676]">{compatibility_score}%</span>
-          </div>
-          <div className="h-1.5 w-full bg-white/10 rounded-full overflow-hidden">
-            <motion.div
-              initial={{ width: 0 }}
-              animate={{ width: `${compatibility_score}%` }}
-              className="h-full bg-gradient-to-r from-pink-500 to-[#00e676]"
-            />
+        {compatibility_score != null && (
+          <div className="space-y-1.5">
+            <div className="flex justify-between text-[10px] font-bold text-white/50 uppercase tracking-widest">
+              <span>Match Score</span>
+              <span className="text-[#00e676]">{compatibility_score}%</span>
+            </div>
+            <div className="h-1.5 w-full bg-white/10 rounded-full overflow-hidden">
+              <motion.div
+                initial={{ width: 0 }}
+                animate={{ width: `${compatibility_score}%` }}
+                className="h-full bg-gradient-to-r from-pink-500 to-[#00e676]"
+              />
+            </div>
           </div>
-        </div>
+        )}
 
         {/* GitHub Link (Interactive part) */}
         <a
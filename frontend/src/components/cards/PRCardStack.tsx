@@ -1,12 +1,13 @@
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { motion, AnimatePresence } from "framer-motion";
-import { PR } from "../../api/prs";
+import { PR, isHydrated } from "../../api/prs";
 import { PRCard } from "./PRCard";
 import { AdCard } from "./AdCard";
 
 interface PRCardStackProps {
   prs: PR[];
   onAnimationComplete: (direction: "left" | "right") => void;
+  onHydrate?: (prs: PR[]) => void;
 }
 
 interface RenderItem {
@@ -15,6 +16,12 @@ interface RenderItem {
   data: PR | null;
 }
 
+const renderKey = (pr: PR): string => `pr-${pr.repo}-${pr.number}`;
+
+// Summary cards this close to the top get their full details fetched, in
+// one batch request
+const HYDRATE_AHEAD = 10;
+
 /**
  * HELPER: Decides where to inject ads in the PR stream
  */
@@ -44,7 +51,7 @@ function buildRenderList(prs: PR[], adPositions: number[]): RenderItem[] {
   for (let i = 0; i < prs.length; i++) {
     list.push({
       type: "pr",
-      key: `pr-${prs[i].repo}-${prs[i].number}`,
+      key: renderKey(prs[i]),
       data: prs[i],
     });
 
@@ -62,7 +69,50 @@ function buildRenderList(prs: PR[], adPositions: number[]): RenderItem[] {
   return list;
 }
 
-export function PRCardStack({ prs, onAnimationComplete }: PRCardStackProps) {
+/**
+ * HELPER: Reconciles the render list with a refreshed PR queue without
+ * reshuffling the deck: gone PRs drop out, updated PRs are swapped in place,
+ * new PRs join the back (or the top when restored there, e.g. by undo)
+ */
+function syncRenderList(prev: RenderItem[], prs: PR[]): RenderItem[] {
+  const byKey = new Map(prs.map((pr) => [renderKey(pr), pr]));
+  let changed = false;
+
+  const next = prev.flatMap((item) => {
+    if (item.type === "ad") return [item];
+    const pr = byKey.get(item.key);
+    if (!pr) {
+      changed = true;
+      return [];
+    }
+    if (pr !== item.data) {
+      changed = true;
+      return [{ ...item, data: pr }];
+    }
+    return [item];
+  });
+
+  const known = new Set(next.map((item) => item.key));
+  prs.forEach((pr, index) => {
+    const key = renderKey(pr);
+    if (known.has(key)) return;
+    changed = true;
+    const item: RenderItem = { type: "pr", key, data: pr };
+    if (index === 0) {
+      next.unshift(item);
+    } else {
+      next.push(item);
+    }
+  });
+
+  return changed ? next : prev;
+}
+
+export function PRCardStack({
+  prs,
+  onAnimationComplete,
+  onHydrate,
+}: PRCardStackProps) {
   const [swipeDirection, setSwipeDirection] = useState<"left" | "right" | null>(
     null,
   );
@@ -71,6 +121,20 @@ export function PRCardStack({ prs, onAnimationComplete }: PRCardStackProps) {
     return buildRenderList(prs, computeAdPositions(prs.length));
   });
 
+  useEffect(() => {
+    setRenderList((prev) => syncRenderList(prev, prs));
+  }, [prs]);
+
+  useEffect(() => {
+    if (!onHydrate) return;
+    const upcoming = renderList
+      .filter((item) => item.type === "pr")
+      .slice(0, HYDRATE_AHEAD)
+      .map((item) => item.data as PR)
+      .filter((pr) => !isHydrated(pr));
+    if (upcoming.length > 0) onHydrate(upcoming);
+  }, [renderList, onHydrate]);
+
   if (renderList.length === 0) {
     return null;
   }
@@ -1,10 +1,12 @@
 import { useNavigate } from "react-router-dom";
 import { GitBranch, LogOut } from "lucide-react";
 import { useAuthStore } from "../../store/authStore";
+import { usePRCount } from "../../hooks/usePRCount";
 
 export function Header() {
   const { user, logout } = useAuthStore();
   const navigate = useNavigate();
+  const backlog = usePRCount(undefined, user != null);
 
   const handleLogout = async () => {
     await logout();
@@ -28,6 +30,14 @@ export function Header() {
 
         {user && (
           <div className="flex items-center gap-4">
+            {backlog != null && (
+              <span
+                className="font-mono text-xs px-2 py-1 rounded-full bg-bg-secondary text-text-secondary"
+                title="Open PRs waiting for review"
+              >
+                {backlog} waiting
+              </span>
+            )}
             <div className="flex items-center gap-3">
               <img
                 src={user.avatar_url}
@@ -0,0 +1,34 @@
+import { useEffect, useState } from "react";
+import { getPRCount } from "../api/prs";
+
+const PR_COUNT_INTERVAL_MS = 60_000;
+
+/**
+ * Open PRs waiting across the user's repos (or in one repo), polled from
+ * the cheap count endpoint rather than by loading the queue. null until
+ * the backend can answer, which for all repos is after the first load.
+ */
+export function usePRCount(repo?: string, enabled: boolean = true) {
+  const [count, setCount] = useState<number | null>(null);
+
+  useEffect(() => {
+    if (!enabled) return;
+    let cancelled = false;
+    const poll = async () => {
+      try {
+        const result = await getPRCount(repo);
+        if (!cancelled) setCount(result.count);
+      } catch {
+        // Keep the last known count; the next tick retries
+      }
+    };
+    poll();
+    const interval = window.setInterval(poll, PR_COUNT_INTERVAL_MS);
+    return () => {
+      cancelled = true;
+      window.clearInterval(interval);
+    };
+  }, [repo, enabled]);
+
+  return count;
+}
@@ -3,9 +3,11 @@ import { CheckCircle2, XCircle, GitPullRequest } from "lucide-react";
 import { PageWrapper } from "../components/layout/PageWrapper";
 import { Header } from "../components/layout/Header";
 import { usePRStore } from "../store/prStore";
+import { usePRCount } from "../hooks/usePRCount";
 
 export function AllCaughtUpPage() {
   const { mergedCount, closedCount, reviewedCount } = usePRStore();
+  const backlog = usePRCount();
 
   return (
     <PageWrapper>
@@ -30,6 +32,9 @@ export function AllCaughtUpPage() {
           </h1>
           <p className="font-body text-text-secondary mb-8">
             Great job reviewing all the PRs.
+            {backlog != null && backlog > 0 && (
+              <> {backlog} still open across your repos.</>
+            )}
           </p>
 
           <div className="grid grid-cols-3 gap-4 mb-8">
@@ -7,6 +7,8 @@ import { PRCardStack } from "../components/cards/PRCardStack";
 import { LoadingCard } from "../components/ui/LoadingCard";
 import { usePRStore } from "../store/prStore";
 
+const PR_REFRESH_INTERVAL_MS = 60_000;
+
 export function SwipePage() {
   const navigate = useNavigate();
   const {
@@ -16,6 +18,8 @@ export function SwipePage() {
     currentRepo,
     reviewedCount,
     loadAllPRs,
+    refreshPRs,
+    hydrate,
     swipeLeft,
     swipeRight,
     clearError,
@@ -37,6 +41,16 @@ export function SwipePage() {
     }
   }, [currentRepo, loadAllPRs]);
 
+  useEffect(() => {
+    if (!currentRepo) return;
+    const interval = window.setInterval(refreshPRs, PR_REFRESH_INTERVAL_MS);
+    window.addEventListener("focus", refreshPRs);
+    return () => {
+      window.clearInterval(interval);
+      window.removeEventListener("focus", refreshPRs);
+    };
+  }, [currentRepo, refreshPRs]);
+
   const totalPRs = prQueue.length + reviewedCount;
   const currentPR = prQueue[0];
 
@@ -162,6 +176,7 @@ export function SwipePage() {
           <PRCardStack
             prs={prQueue}
             onAnimationComplete={handleAnimationComplete}
+            onHydrate={hydrate}
           />
 
           <p className="text-center mt-6 font-body text-xs text-text-secondary">
@@ -1,13 +1,82 @@
 import { create } from "zustand";
-import { getAllPRs, mergePR, closePR, PR } from "../api/prs";
+import {
+  getAllPRs,
+  getPRChanges,
+  getPRDetails,
+  isHydrated,
+  mergePR,
+  closePR,
+  PR,
+  PRChanges,
+  PRKey,
+} from "../api/prs";
 
 interface HistoryItem {
   pr: PR;
   action: "merge" | "close";
 }
 
+const prKey = (pr: PRKey): string => `${pr.repo}#${pr.number}`;
+
+// The queue is loaded as summaries; cards are hydrated as they near the top
+const QUEUE_VIEW = "summary";
+// Highest-priority cards lead the queue; the rest stay shuffled
+const QUEUE_ORDER = "score";
+// Show whatever is ready after this long; the rest is fetched as a diff
+const QUEUE_DEADLINE_MS = 5000;
+
+// Cards with a hydrate request in flight, so re-renders don't ask twice
+const hydrating = new Set<string>();
+
+/**
+ * Applies a server-side diff to the queue in place: removed cards drop out,
+ * changed cards are swapped where they stand and new cards join the back.
+ * Cards the user already swiped are never brought back.
+ */
+function applyPRChanges(
+  queue: PR[],
+  changes: PRChanges,
+  history: HistoryItem[],
+): PR[] {
+  const reviewed = new Set(history.map((item) => prKey(item.pr)));
+  const removed = new Set(changes.removed.map(prKey));
+  const updates = new Map(changes.changed.map((pr) => [prKey(pr), pr]));
+
+  if (changes.reset) {
+    const incoming = new Map(changes.added.map((pr) => [prKey(pr), pr]));
+    queue.forEach((pr) => {
+      if (!incoming.has(prKey(pr))) removed.add(prKey(pr));
+    });
+    incoming.forEach((pr, key) => updates.set(key, pr));
+  }
+
+  const next = queue
+    .filter((pr) => !removed.has(prKey(pr)))
+    .map((pr) => {
+      const update = updates.get(prKey(pr));
+      if (!update) return pr;
+      // A summary that matches an already hydrated card doesn't downgrade it
+      const sameCard =
+        isHydrated(pr) &&
+        !isHydrated(update) &&
+        pr.head_sha === update.head_sha &&
+        pr.title === update.title &&
+        pr.draft === update.draft;
+      return sameCard ? pr : update;
+    });
+  const present = new Set(next.map(prKey));
+  for (const pr of changes.added) {
+    const key = prKey(pr);
+    if (!present.has(key) && !reviewed.has(key)) {
+      next.push(pr);
+    }
+  }
+  return next;
+}
+
 interface PRState {
   currentRepo: string | null;
+  snapshotVersion: string | null;
   prQueue: PR[];
   reviewedCount: number;
   mergedCount: number;
@@ -18,6 +87,8 @@ interface PRState {
   setRepo: (repo: string) => void;
   loadPRs: (repo: string) => Promise<void>;
   loadAllPRs: () => Promise<void>;
+  refreshPRs: () => Promise<void>;
+  hydrate: (prs: PR[]) => Promise<void>;
   swipeRight: (pr: PR) => Promise<void>;
   swipeLeft: (pr: PR) => Promise<void>;
   undo: () => Promise<void>;
@@ -26,6 +97,7 @@ interface PRState {
 
 export const usePRStore = create<PRState>((set, get) => ({
   currentRepo: null,
+  snapshotVersion: null,
   prQueue: [],
   reviewedCount: 0,
   mergedCount: 0,
@@ -41,9 +113,10 @@ export const usePRStore = create<PRState>((set, get) => ({
   loadPRs: async (repo: string) => {
     set({ isLoading: true, error: null });
     try {
-      const prs = await getAllPRs();
+      const { prs, version } = await getAllPRs(QUEUE_VIEW, QUEUE_ORDER);
       set({
         prQueue: prs,
+        snapshotVersion: version,
         currentRepo: repo,
         isLoading: false,
         reviewedCount: 0,
@@ -61,9 +134,14 @@ export const usePRStore = create<PRState>((set, get) => ({
   loadAllPRs: async () => {
     set({ isLoading: true, error: null });
     try {
-      const prs = await getAllPRs();
+      const { prs, version, complete } = await getAllPRs(
+        QUEUE_VIEW,
+        QUEUE_ORDER,
+        QUEUE_DEADLINE_MS,
+      );
       set({
         prQueue: prs,
+        snapshotVersion: version,
         currentRepo: "all",
         isLoading: false,
         reviewedCount: 0,
@@ -71,6 +149,8 @@ export const usePRStore = create<PRState>((set, get) => ({
         closedCount: 0,
         history: [],
       });
+      // The server keeps loading; this waits for it and adds the rest
+      if (!complete) get().refreshPRs();
     } catch (error: unknown) {
       const message =
         error instanceof Error ? error.message : "Failed to load PRs";
@@ -78,6 +158,50 @@ export const usePRStore = create<PRState>((set, get) => ({
     }
   },
 
+  refreshPRs: async () => {
+    const { snapshotVersion, isLoading } = get();
+    if (isLoading) return;
+    try {
+      const changes = await getPRChanges(
+        snapshotVersion,
+        QUEUE_VIEW,
+        QUEUE_ORDER,
+      );
+      set((state) => ({
+        prQueue: applyPRChanges(state.prQueue, changes, state.history),
+        snapshotVersion: changes.version,
+      }));
+    } catch {
+      // Background refresh; the next tick retries
+    }
+  },
+
+  hydrate: async (prs: PR[]) => {
+    const pending = prs.filter(
+      (pr) => !isHydrated(pr) && !hydrating.has(prKey(pr)),
+    );
+    if (pending.length === 0) return;
+    pending.forEach((pr) => hydrating.add(prKey(pr)));
+    try {
+      const results = await getPRDetails(pending);
+      const byKey = new Map(results.map((result) => [prKey(result), result]));
+      set((state) => ({
+        prQueue: state.prQueue.flatMap((pr) => {
+          const result = byKey.get(prKey(pr));
+          // Closed or deleted since the queue was loaded
+          if (result?.status === 404 || result?.status === 410) return [];
+          const full = result?.pr;
+          // Skip cards that moved on (new head) while the request was out
+          return [full && full.head_sha === pr.head_sha ? full : pr];
+        }),
+      }));
+    } catch {
+      // Cards stay as summaries; the stack asks again on its next change
+    } finally {
+      pending.forEach((pr) => hydrating.delete(prKey(pr)));
+    }
+  },
+
   swipeRight: async (pr: PR) => {
     // 1. Optimistically remove immediately
     set((state) => ({
@@ -91,7 +215,10 @@ export const usePRStore = create<PRState>((set, get) => ({
 
     // 2. Fire API call in background — do NOT await
     try {
-      await mergePR(pr.number, { repo: pr.repo });
+      await mergePR(pr.number, {
+        repo: pr.repo,
+        sha: pr.head_sha || undefined,
+      });
     } catch (error: unknown) {
       const message =
         error instanceof Error